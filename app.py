@@ -1,7 +1,13 @@
-from flask import Flask, redirect, url_for, session, request, render_template, flash, Response
-import requests
-from services.api_client import API_BASE
+import os
+from flask import Flask, redirect, url_for, session, request, render_template, flash, jsonify
 from services.api_client import ApiError
+from services.api_client import pool_stats
+from services.cache import cache_stats, memo_request_stats
+from services.upload_imagem import upload_stats
+from services.jobs import jobs_stats
+from services.ao_vivo import ao_vivo_stats
+from services import media_service
+from services import media_variantes
 from routes.auth import auth_bp
 from routes.index import index_bp
 from routes.peladas import peladas_bp
@@ -17,27 +23,49 @@ def create_app():
     app = Flask(__name__)
     app.secret_key = "super-secret-key"  # troque em prod
 
+    # X-Sendfile (Apache/lighttpd) para arquivos do cache de mídia: MEDIA_USE_X_SENDFILE=1
+    app.config["USE_X_SENDFILE"] = os.environ.get("MEDIA_USE_X_SENDFILE", "0") == "1"
+
     @app.get("/media/<path:subpath>")
     def media_proxy(subpath: str):
         """
         Proxy de imagens do backend (API_BASE) para o mesmo host do front.
         Isso permite capturar screenshots (html2canvas) sem bloquear imagens por CORS.
         Funciona sem autenticação para permitir acesso público.
+        Repassa em streaming e guarda em cache no disco (ver services/media_service.py).
         """
         # allowlist simples
         if not subpath.startswith("static/"):
             return ("Not found", 404)
         try:
-            url = f"{API_BASE}/{subpath}"
-            # Não envia token de autenticação para permitir acesso público
-            r = requests.get(url, timeout=20)
-            resp = Response(r.content, status=r.status_code)
-            ct = r.headers.get("Content-Type") or "application/octet-stream"
-            resp.headers["Content-Type"] = ct
-            resp.headers["Cache-Control"] = "public, max-age=86400"
-            return resp
+            return media_service.servir(subpath)
         except Exception:
             return ("Not found", 404)
+
+    @app.get("/media/<any(thumb, sm, md):variante>/<path:subpath>")
+    def media_variante(variante: str, subpath: str):
+        """
+        Versão reduzida (largura máxima em media_variantes.VARIANTES) da imagem do backend.
+        WebP quando o navegador aceita, senão JPEG. Fica no mesmo cache em disco do /media.
+        """
+        if not subpath.startswith("static/"):
+            return ("Not found", 404)
+        try:
+            return media_variantes.servir_variante(variante, subpath)
+        except Exception as e:
+            print(f"[WARN] Erro ao gerar variante {variante} de {subpath}: {e}")
+            return ("Not found", 404)
+
+    @app.get("/_metrics")
+    def metrics():
+        """Métricas internas (pool HTTP etc). Exige login como o resto do app."""
+        return jsonify({
+            "http_pool": pool_stats(),
+            "cache": cache_stats(),
+            "uploads": upload_stats(),
+            "jobs": jobs_stats(),
+            "ao_vivo": ao_vivo_stats(),
+        })
     
     # Filtro Jinja2 para criar slug do nome
     @app.template_filter('slug')
@@ -93,6 +121,13 @@ def create_app():
         except Exception:
             return str(data_str)  # Retorna original em caso de erro
 
+    @app.after_request
+    def _log_memo_request(response):
+        dedup = memo_request_stats()
+        if dedup:
+            print(f"[DEBUG] {request.method} {request.path}: {sum(dedup.values())} chamada(s) deduplicada(s) no request {dedup}")
+        return response
+
     @app.before_request
     def _auth_guard():
         public_paths = {"/login", "/register"}
@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, session, url_for, flash
-from services.auth_service import login as api_login, register as api_register
-from services.api_client import ApiError
+from services.auth_service import login as api_login, register as api_register, me as api_me
+from services.api_client import ApiError, SESSION_ME_KEY
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -11,6 +11,12 @@ def login():
             data = api_login(request.form.get("username","").strip(), request.form.get("senha",""))
             session["access_token"] = data.get("token_acesso")
             session["refresh_token"] = data.get("token_atualizacao")
+            # já deixa o usuário (me) em cache na sessão para as próximas telas
+            session.pop(SESSION_ME_KEY, None)
+            try:
+                api_me(forcar=True)
+            except ApiError:
+                pass
             return redirect(url_for("peladas.list_create"))
         except ApiError as e:
             flash(e.payload.get("erro","Falha no login"), "error")
@@ -1,12 +1,37 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, current_app
 from services import partida_service as svc
 from services import time_service as time_svc
 from services import rodada_service as rodada_svc
 from services import gol_service as gol_svc
-from services.api_client import ApiError
+from services.api_client import ApiError, token_atual
+from services import ao_vivo
+from services import placar_otimista
+from services.fanout import em_paralelo
 
 partidas_bp = Blueprint("partidas", __name__)
 
+def _canal_partida(partida_id: int) -> str:
+    return f"partida:{partida_id}"
+
+def _publicar_placar(partida_id: int, partida: dict):
+    """Repassa o placar/timeline já renderizados para quem está assistindo a partida (SSE)"""
+    canal = _canal_partida(partida_id)
+    if not ao_vivo.assinantes(canal):
+        return
+    ao_vivo.publicar(canal, "placar", render_template("partidas/_placar.html", partida=partida))
+    ao_vivo.publicar(canal, "timeline", render_template("partidas/_timeline.html", partida=partida))
+
+def _reconciliar_em_background(partida_id: int):
+    """Confere o placar otimista com a API fora do request; se divergiu, republica o placar real"""
+    app = current_app._get_current_object()
+    base_url = request.host_url
+
+    def republicar(partida):
+        with app.test_request_context("/", base_url=base_url):
+            _publicar_placar(partida_id, partida)
+
+    placar_otimista.reconciliar_em_background(partida_id, token_atual(), republicar)
+
 @partidas_bp.route("/rodadas/<int:rodada_id>/partidas", methods=["GET","POST"])
 def list_create(rodada_id: int):
     if request.method == "POST":
@@ -46,13 +71,24 @@ def detalhe(partida_id: int):
         rodada_id = data.get("rodada_id")
         casa_id = data.get("time_casa_id") or (data.get("time_casa") or {}).get("id")
         fora_id = data.get("time_fora_id") or (data.get("time_fora") or {}).get("id")
-        try:
-            if casa_id:
-                data["time_casa_full"] = time_svc.obter_time(int(casa_id)).get("time")
-            if fora_id:
-                data["time_fora_full"] = time_svc.obter_time(int(fora_id)).get("time")
-        except Exception:
-            pass
+
+        def _elenco(time_id):
+            try:
+                return time_svc.obter_time(int(time_id)).get("time")
+            except Exception as e:
+                print(f"[WARN] Erro ao buscar elenco do time {time_id}: {e}")
+                return None
+
+        # elencos vêm do cache; sem cache, os dois times são buscados em paralelo
+        chamadas = {}
+        if casa_id:
+            chamadas["time_casa_full"] = lambda: _elenco(casa_id)
+        if fora_id:
+            chamadas["time_fora_full"] = lambda: _elenco(fora_id)
+        for chave, elenco in em_paralelo(chamadas).items():
+            if elenco is not None:
+                data[chave] = elenco
+        placar_otimista.lembrar(data)
     return render_template("partidas/detalhe.html", partida=data, rodada_id=rodada_id)
 
 @partidas_bp.route("/partidas/<int:partida_id>/iniciar", methods=["POST"])
@@ -85,12 +121,19 @@ def htmx_criar_gol(partida_id: int):
         }
         if request.form.get("assistencia_id"):
             payload["assistencia_id"] = int(request.form.get("assistencia_id"))
-        gol_svc.criar_gol(partida_id, payload)
+        resposta = gol_svc.criar_gol(partida_id, payload)
     except ApiError as e:
         # devolve um bloco simples com erro
         return render_template("gols/_error.html", erro=e.payload.get("erro","Erro ao registrar gol")), 400
 
-    partida = svc.obter_partida(partida_id).get("partida")
+    # aplica o gol no snapshot da partida (sem nova ida à API); confere em background
+    partida = placar_otimista.aplicar_gol_criado(partida_id, payload, resposta)
+    if partida is not None:
+        _reconciliar_em_background(partida_id)
+    else:
+        partida = svc.obter_partida(partida_id).get("partida")
+        placar_otimista.lembrar(partida)
+    _publicar_placar(partida_id, partida)
     return render_template("partidas/_placar_e_timeline.html", partida=partida)
 
 @partidas_bp.route("/gols/<int:gol_id>/delete", methods=["POST"])
@@ -100,5 +143,27 @@ def htmx_remover_gol(gol_id: int):
         gol_svc.remover_gol(gol_id)
     except ApiError as e:
         return render_template("gols/_error.html", erro=e.payload.get("erro","Erro ao remover gol")), 400
-    partida = svc.obter_partida(partida_id).get("partida")
+    partida = placar_otimista.aplicar_gol_removido(partida_id, gol_id)
+    if partida is not None:
+        _reconciliar_em_background(partida_id)
+    else:
+        partida = svc.obter_partida(partida_id).get("partida")
+        placar_otimista.lembrar(partida)
+    _publicar_placar(partida_id, partida)
     return render_template("partidas/_placar_e_timeline.html", partida=partida)
+
+@partidas_bp.route("/partidas/<int:partida_id>/stream")
+def stream(partida_id: int):
+    """
+    Placar ao vivo (SSE, consumido pela extensão sse do HTMX em partidas/detalhe.html).
+    Os gols publicam o fragmento já renderizado: uma busca na API por mudança, para todos.
+    """
+    try:
+        svc.obter_partida(partida_id)  # confere o acesso de quem está assistindo
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
+    canal = _canal_partida(partida_id)
+    resp = Response(ao_vivo.stream(canal, ao_vivo.assinar(canal)), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
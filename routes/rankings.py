@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request
 from services import ranking_service as svc
 from services.api_client import ApiError
+from services import estatisticas
 
 rankings_bp = Blueprint("rankings", __name__)
 
@@ -125,43 +126,9 @@ def scout(temporada_id: int):
                     print(f"[WARN] Erro ao buscar jogadores do time campeão: {e}")
                     jogadores_campeoes = []
         
-        # Busca ranking de artilheiros para calcular total de gols
-        artilheiros_data = svc.ranking_artilheiros(temporada_id, limit=1000)  # Limite alto para pegar todos
-        if isinstance(artilheiros_data, list):
-            ranking_artilheiros = artilheiros_data
-        elif isinstance(artilheiros_data, dict):
-            ranking_artilheiros = artilheiros_data.get("ranking", [])
-        else:
-            ranking_artilheiros = []
-        
-        total_gols = 0
-        for item in ranking_artilheiros:
-            if isinstance(item, dict):
-                # Tenta diferentes campos possíveis (mesma lógica do template)
-                jogador = item.get("jogador", {})
-                gols = (jogador.get("total_gols") if isinstance(jogador, dict) else None) or item.get("gols") or item.get("total_gols") or 0
-                total_gols += int(gols) if gols else 0
-            elif isinstance(item, (int, float)):
-                total_gols += int(item)
-        
-        # Busca ranking de assistências para calcular total
-        assistencias_data = svc.ranking_assistencias(temporada_id, limit=1000)  # Limite alto para pegar todos
-        if isinstance(assistencias_data, list):
-            ranking_assistencias = assistencias_data
-        elif isinstance(assistencias_data, dict):
-            ranking_assistencias = assistencias_data.get("ranking", [])
-        else:
-            ranking_assistencias = []
-        
-        total_assistencias = 0
-        for item in ranking_assistencias:
-            if isinstance(item, dict):
-                # Tenta diferentes campos possíveis (mesma lógica do template)
-                jogador = item.get("jogador", {})
-                assistencias = (jogador.get("total_assistencias") if isinstance(jogador, dict) else None) or item.get("assistencias") or item.get("total_assistencias") or 0
-                total_assistencias += int(assistencias) if assistencias else 0
-            elif isinstance(item, (int, float)):
-                total_assistencias += int(item)
+        # Totais de gols e assistências (limite alto para pegar todos; payload normalizado uma vez em colunas)
+        total_gols = estatisticas.total(estatisticas.coluna(svc.ranking_artilheiros(temporada_id, limit=1000), "gols"))
+        total_assistencias = estatisticas.total(estatisticas.coluna(svc.ranking_assistencias(temporada_id, limit=1000), "assistencias"))
         
         return render_template(
             "rankings/scout.html",
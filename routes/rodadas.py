@@ -3,7 +3,10 @@ from services import rodada_service as svc
 from services import time_service as time_svc
 from services import temporada_service as temp_svc
 from services import partida_service as partida_svc
+from services import jogador_service as jogador_svc
+from services import balanceamento
 from services.api_client import ApiError
+from services.fanout import em_paralelo
 
 rodadas_bp = Blueprint("rodadas", __name__)
 
@@ -42,6 +45,46 @@ def list_create(temporada_id: int):
 
     return render_template("rodadas/list.html", temporada_id=temporada_id, pelada_id=pelada_id, data=data, times_disponiveis=times_disponiveis)
 
+@rodadas_bp.route("/temporadas/<int:temporada_id>/rodadas/sorteio", methods=["POST"])
+def sorteio(temporada_id: int):
+    """Sugere times equilibrados (HTMX) com os jogadores ativos da pelada e os números da temporada"""
+    try:
+        quantidade_times = int(request.form.get("quantidade_times") or "0")
+        jogadores_por_time = int(request.form.get("jogadores_por_time") or "0") or None
+        time_ids = [int(tid) for tid in request.form.getlist("time_ids") if tid]
+    except ValueError:
+        return render_template("rodadas/_error.html", erro="Quantidade de times, jogadores por time e times devem ser números"), 400
+    quantidade_times = quantidade_times or len(time_ids)
+    if quantidade_times < 2:
+        return render_template("rodadas/_error.html", erro="Informe a quantidade de times (mínimo 2) para sortear"), 400
+
+    def _jogadores():
+        temporada = temp_svc.obter_temporada(temporada_id).get("temporada", {})
+        pelada_id = temporada.get("pelada_id")
+        return jogador_svc.listar_jogadores(pelada_id, per_page=200, ativo=True).get("data", []) if pelada_id else []
+
+    # jogadores da pelada e números da temporada são independentes: busca em paralelo
+    resultados = em_paralelo({
+        "jogadores": _jogadores,
+        "estatisticas": lambda: balanceamento.estatisticas_temporada(temporada_id),
+    })
+    jogadores = {int(j["id"]): j for j in resultados["jogadores"] if j.get("id")}
+    forca = balanceamento.forcas(list(jogadores), resultados["estatisticas"])
+    sorteio = balanceamento.sortear(forca, quantidade_times, jogadores_por_time)
+
+    # times da temporada selecionados no form recebem os grupos sorteados, na ordem
+    times_map = {int(t["id"]): t for t in time_svc.listar_times_pelada(temporada_id).get("data", []) if t.get("id")}
+    destinos = [times_map.get(tid, {"id": tid}) for tid in time_ids] if len(time_ids) == quantidade_times else []
+
+    return render_template(
+        "rodadas/_sorteio.html",
+        temporada_id=temporada_id,
+        sorteio=sorteio,
+        jogadores=jogadores,
+        forca=forca,
+        destinos=destinos,
+    )
+
 @rodadas_bp.route("/rodadas/<int:rodada_id>", methods=["GET", "POST"])
 def detalhe(rodada_id: int):
     # Se for POST, é para criar partida
@@ -53,7 +96,20 @@ def detalhe(rodada_id: int):
             flash(e.payload.get("erro","Erro ao criar partida"), "error")
         return redirect(url_for("rodadas.detalhe", rodada_id=rodada_id))
     
-    data = svc.obter_rodada(rodada_id)
+    def _rodada_e_times():
+        # times disponíveis dependem do temporada_id da rodada, então seguem em cadeia
+        rodada_data = svc.obter_rodada(rodada_id)
+        temp_id = (rodada_data.get("rodada") or {}).get("temporada_id")
+        times_data = time_svc.listar_times_pelada(temp_id) if temp_id else {}
+        return rodada_data, times_data
+
+    # Rodada(+times) e partidas são independentes: busca em paralelo
+    resultados = em_paralelo({
+        "rodada": _rodada_e_times,
+        "partidas": lambda: partida_svc.listar_partidas(rodada_id),
+    })
+    data, times_data = resultados["rodada"]
+    partidas_data = resultados["partidas"]
     rodada = data.get("rodada", {})
     
     # Verificar se a rodada tem times na resposta
@@ -71,14 +127,11 @@ def detalhe(rodada_id: int):
     # Extrair temporada_id para navegação
     temporada_id = rodada.get("temporada_id")
     
-    # Buscar partidas da rodada
-    partidas_data = partida_svc.listar_partidas(rodada_id)
     partidas = partidas_data.get("partidas", [])
     
-    # Buscar times disponíveis para criar partida
+    # Times disponíveis para criar partida
     times_disponiveis = []
     if temporada_id:
-        times_data = time_svc.listar_times_pelada(temporada_id)
         times_disponiveis = times_data.get("data", [])
 
     # Enriquecer partidas com nome/escudo dos times (para evitar "Time 1/Time 2" no template)
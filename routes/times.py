@@ -3,6 +3,9 @@ from services import time_service as svc
 from services import jogador_service as jogador_svc
 from services import temporada_service as temp_svc
 from services.api_client import ApiError
+from services.fanout import em_paralelo
+from services import time_jogadores_index as time_index
+from services import elenco_em_lote
 
 times_bp = Blueprint("times", __name__)
 
@@ -25,6 +28,87 @@ def list_create(temporada_id: int):
     data = svc.listar_times_pelada(temporada_id)
     return render_template("times/list.html", temporada_id=temporada_id, times=data.get("data", []))
 
+def _desejado_do_form(form, time_ids: list) -> dict:
+    """
+    Elenco desejado a partir do form em lote: campos time_<jogador_id>, capitao_<id>, posicao_<id>.
+    `time_ids` no form restringe os times alterados; sem posicao_<id>, posição/capitão ficam como estão.
+    """
+    escopo = {int(t) for t in form.getlist("time_ids") if t.isdigit()}
+    desejado = {t: {} for t in time_ids if not escopo or t in escopo}
+    for campo, valor in form.items():
+        if not campo.startswith("time_") or campo == "time_ids" or not valor:
+            continue
+        try:
+            jogador_id, time_id = int(campo[5:]), int(valor)
+        except ValueError:
+            continue
+        if time_id in desejado:
+            dados = {}
+            if f"posicao_{jogador_id}" in form:
+                dados = {
+                    "capitao": form.get(f"capitao_{jogador_id}") == "on",
+                    "posicao": form.get(f"posicao_{jogador_id}", "").strip() or None,
+                }
+            desejado[time_id][jogador_id] = dados
+    return desejado
+
+@times_bp.route("/temporadas/<int:temporada_id>/times/elenco", methods=["GET","POST"])
+def elenco_lote(temporada_id: int):
+    """Monta os elencos de todos os times da temporada de uma vez (um POST, um fragmento)"""
+    times_list = svc.listar_times_pelada(temporada_id, per_page=200).get("data", [])
+    time_ids = [int(t["id"]) for t in times_list if t.get("id")]
+
+    is_htmx = request.headers.get("HX-Request") == "true"
+    resultado = None
+    if request.method == "POST":
+        try:
+            resultado = elenco_em_lote.sincronizar(_desejado_do_form(request.form, time_ids), demais_times=time_ids)
+            times = dict(resultado["times"])
+            fora = [t for t in time_ids if t not in times]
+            if fora:
+                times.update(em_paralelo({t: (lambda t=t: svc.obter_time(t).get("time")) for t in fora}))
+        except ApiError as e:
+            if is_htmx:
+                return render_template("times/_error.html", erro=e.payload.get("erro","Erro ao montar elencos")), 400
+            flash(e.payload.get("erro","Erro ao montar elencos"), "error")
+            return redirect(url_for("times.elenco_lote", temporada_id=temporada_id))
+        if resultado["falhas"]:
+            print(f"[WARN] Elenco em lote: {len(resultado['falhas'])} operações falharam: {resultado['falhas']}")
+        if not is_htmx:
+            if resultado["falhas"]:
+                flash(f"{len(resultado['falhas'])} alterações falharam; confira os elencos", "error")
+            else:
+                flash("Elencos atualizados!", "ok")
+            return redirect(url_for("times.elenco_lote", temporada_id=temporada_id))
+    else:
+        times = em_paralelo({t: (lambda t=t: svc.obter_time(t).get("time")) for t in time_ids})
+
+    temporada = temp_svc.obter_temporada(temporada_id).get("temporada", {})
+    pelada_id = temporada.get("pelada_id")
+    jogadores = jogador_svc.listar_jogadores(pelada_id, per_page=200).get("data", []) if pelada_id else []
+
+    # elenco atual por jogador; jogadores que estão em times mas fora da lista da pelada também
+    # aparecem (senão o próximo envio os removeria)
+    atribuicoes = {}
+    por_id = {int(j["id"]): j for j in jogadores if j.get("id")}
+    for t in time_ids:
+        time = times.get(t) or {}
+        for j in time.get("jogadores") or []:
+            if isinstance(j, dict) and j.get("id"):
+                atribuicoes[int(j["id"])] = {"time_id": t, "capitao": bool(j.get("capitao")), "posicao": j.get("posicao") or ""}
+                por_id.setdefault(int(j["id"]), j)
+
+    contexto = dict(
+        temporada_id=temporada_id,
+        times=[times.get(t) or {"id": t} for t in time_ids],
+        jogadores=sorted(por_id.values(), key=lambda j: (j.get("apelido") or j.get("nome_completo") or "").lower()),
+        atribuicoes=atribuicoes,
+        resultado=resultado,
+    )
+    if is_htmx:
+        return render_template("times/_elenco_lote.html", **contexto)
+    return render_template("times/elenco.html", **contexto)
+
 @times_bp.route("/times/<int:time_id>", methods=["GET","POST"])
 def detalhe(time_id: int):
     if request.method == "POST":
@@ -34,51 +118,53 @@ def detalhe(time_id: int):
         
         try:
             if action == "add":
+                jogador_id = int(request.form.get("jogador_id"))
                 svc.adicionar_jogador(
                     time_id=time_id,
-                    jogador_id=int(request.form.get("jogador_id")),
+                    jogador_id=jogador_id,
                     capitao=(request.form.get("capitao") == "on"),
                     posicao=request.form.get("posicao","").strip() or None
                 )
+                time_index.atribuir(time_id, jogador_id)
                 if is_htmx:
                     # Retorna apenas a lista de jogadores atualizada
                     time = svc.obter_time(time_id).get("time")
                     return render_template("times/_jogadores_list.html", time=time)
                 flash("Jogador adicionado!", "ok")
             elif action == "remove":
-                svc.remover_jogador(time_id, int(request.form.get("jogador_id")))
+                jogador_id = int(request.form.get("jogador_id"))
+                svc.remover_jogador(time_id, jogador_id)
+                time_index.liberar(time_id, jogador_id)
                 if is_htmx:
                     # Retorna apenas a lista de jogadores atualizada
                     time = svc.obter_time(time_id).get("time")
                     return render_template("times/_jogadores_list.html", time=time)
                 flash("Jogador removido!", "ok")
             elif action == "update":
-                # Atualiza a posição do jogador
+                # Atualiza a posição do jogador (mantém o capitão); falha vira o fragmento de erro
                 jogador_id = int(request.form.get("jogador_id"))
                 nova_posicao = request.form.get("posicao", "").strip() or None
-                # Busca o jogador atual para manter os outros dados
-                time_atual = svc.obter_time(time_id).get("time")
-                jogador_atual = None
-                if time_atual and time_atual.get("jogadores"):
-                    for j in time_atual["jogadores"]:
-                        if j.get("id") == jogador_id:
-                            jogador_atual = j
-                            break
-                
-                # Remove e readiciona com a nova posição (ou atualiza se houver endpoint específico)
+                # elenco vem do cache; precisa ser lido antes da escrita (que invalida o cache)
+                time_atual = svc.obter_time(time_id).get("time") or {}
+                jogador_atual = next(
+                    (j for j in time_atual.get("jogadores") or [] if j.get("id") == jogador_id), None
+                )
                 if jogador_atual:
-                    # Remove o jogador
-                    svc.remover_jogador(time_id, jogador_id)
-                    # Readiciona com a nova posição
-                    svc.adicionar_jogador(
+                    resposta = svc.atualizar_jogador_time(
                         time_id=time_id,
                         jogador_id=jogador_id,
+                        posicao=nova_posicao,
                         capitao=jogador_atual.get("capitao", False),
-                        posicao=nova_posicao
                     )
-                
+                    if is_htmx:
+                        # Renderiza da resposta (se trouxer o time) ou do elenco com a posição aplicada
+                        time = resposta.get("time") if isinstance(resposta, dict) else None
+                        if not (isinstance(time, dict) and "jogadores" in time):
+                            jogador_atual["posicao"] = nova_posicao
+                            time = time_atual
+                        return render_template("times/_jogadores_list.html", time=time)
+
                 if is_htmx:
-                    # Retorna apenas a lista de jogadores atualizada
                     time = svc.obter_time(time_id).get("time")
                     return render_template("times/_jogadores_list.html", time=time)
                 flash("Posição atualizada!", "ok")
@@ -92,7 +178,7 @@ def detalhe(time_id: int):
         except ApiError as e:
             if is_htmx:
                 # Retorna mensagem de erro para HTMX
-                return f'<div class="rounded-md px-4 py-3 text-xs border backdrop-blur-xl bg-rose-50/60 border-rose-300/60 text-rose-800">{e.payload.get("erro","Erro na ação")}</div>', 400
+                return render_template("times/_error.html", erro=e.payload.get("erro","Erro na ação")), 400
             flash(e.payload.get("erro","Erro na ação"), "error")
         
         if is_htmx:
@@ -107,47 +193,32 @@ def detalhe(time_id: int):
     jogadores_disponiveis = []
     if isinstance(time, dict) and time.get("temporada_id"):
         temporada_id = time["temporada_id"]
-        temporada = temp_svc.obter_temporada(temporada_id).get("temporada", {})
-        pelada_id = temporada.get("pelada_id")
-        if pelada_id:
-            # Lista todos os jogadores da pelada
-            todos_jogadores = jogador_svc.listar_jogadores(pelada_id, per_page=200).get("data", [])
-            
-            # Coleta IDs dos jogadores que já estão em algum time da temporada (incluindo o próprio time)
-            jogadores_em_times = set()
+
+        def _pelada_e_jogadores():
+            # jogadores dependem do pelada_id da temporada, então seguem em cadeia
+            temporada = temp_svc.obter_temporada(temporada_id).get("temporada", {})
+            p_id = temporada.get("pelada_id")
+            jogadores = jogador_svc.listar_jogadores(p_id, per_page=200).get("data", []) if p_id else []
+            return p_id, jogadores
+
+        def _jogadores_em_times():
             try:
-                times_data = svc.listar_times_pelada(temporada_id, per_page=200)
-                times_list = times_data.get("data", [])
-                
-                for t in times_list:
-                    # Coleta IDs dos jogadores deste time (incluindo o time atual)
-                    # Pode vir em diferentes formatos: lista de dicts, lista de IDs, ou campo time_jogador
-                    jogadores_time = []
-                    if t.get("jogadores"):
-                        jogadores_time = t["jogadores"]
-                    elif t.get("time_jogadores"):
-                        jogadores_time = t["time_jogadores"]
-                    
-                    for j in jogadores_time:
-                        jogador_id = None
-                        if isinstance(j, dict):
-                            # Se for dict, pode ter id direto ou aninhado
-                            jogador_id = j.get("id") or j.get("jogador_id") or (j.get("jogador", {}).get("id") if isinstance(j.get("jogador"), dict) else None)
-                        elif isinstance(j, (int, str)):
-                            # Se for direto um ID
-                            try:
-                                jogador_id = int(j)
-                            except (ValueError, TypeError):
-                                pass
-                        
-                        if jogador_id:
-                            jogadores_em_times.add(int(jogador_id))
+                return time_index.jogadores_em_times(temporada_id)
             except Exception as e:
                 print(f"[WARN] Erro ao buscar jogadores em times: {e}")
-            
-            # Filtra jogadores disponíveis (exclui os que já estão em outros times)
+                return frozenset()
+
+        # Temporada(+jogadores da pelada) e índice jogador -> time da temporada são independentes: busca em paralelo
+        resultados = em_paralelo({
+            "pelada": _pelada_e_jogadores,
+            "em_times": _jogadores_em_times,
+        })
+        pelada_id, todos_jogadores = resultados["pelada"]
+        if pelada_id:
+            # Filtra jogadores disponíveis (exclui os que já estão em algum time da temporada, incluindo este)
+            jogadores_em_times = resultados["em_times"] | set(time_index.ids_jogadores(time))
             jogadores_disponiveis = [
-                j for j in todos_jogadores 
+                j for j in todos_jogadores
                 if j.get("id") and int(j.get("id")) not in jogadores_em_times
             ]
 
@@ -1,11 +1,15 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, Response
-import base64
+import json
+import uuid
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify, Response, current_app
 from services import rodada_service as rodada_svc
 from services import votacao_service as svc
 from services.api_client import ApiError
-from io import BytesIO
-import requests
-from PIL import Image
+from services import ao_vivo
+from services import votacao_ao_vivo
+from services import gerar_imagem_service as gerar_imagem_svc
+from services import jobs
+from services import jogador_nome_index as nome_index
+from services.cache import escopo_atual
 
 votacoes_bp = Blueprint("votacoes", __name__)
 
@@ -233,44 +237,15 @@ def criar(rodada_id: int):
 
 def _buscar_jogador_por_nome(rodada_id: int, nome_busca: str):
     """
-    Busca um jogador na rodada pelo nome (flexível, case-insensitive, match parcial).
+    Busca um jogador na rodada pelo nome (flexível, case-insensitive, sem acentos, match parcial).
     Retorna o ID do jogador ou None se não encontrar.
+    Usa o índice em memória por rodada (services/jogador_nome_index.py).
     """
     if not nome_busca or not rodada_id:
         return None
     
     try:
-        data = rodada_svc.listar_jogadores_rodada(rodada_id)
-        jogadores = data.get("jogadores", [])
-        
-        nome_busca_lower = nome_busca.lower().strip()
-        
-        # Primeiro tenta match exato (case-insensitive)
-        for j in jogadores:
-            apelido = (j.get("apelido") or "").lower().strip()
-            nome_completo = (j.get("nome_completo") or "").lower().strip()
-            
-            if apelido == nome_busca_lower or nome_completo == nome_busca_lower:
-                return j.get("id")
-        
-        # Se não encontrou exato, tenta match parcial (contém)
-        for j in jogadores:
-            apelido = (j.get("apelido") or "").lower().strip()
-            nome_completo = (j.get("nome_completo") or "").lower().strip()
-            
-            if nome_busca_lower in apelido or nome_busca_lower in nome_completo:
-                return j.get("id")
-        
-        # Se ainda não encontrou, tenta match parcial invertido (nome_busca contém parte do nome)
-        for j in jogadores:
-            apelido = (j.get("apelido") or "").lower().strip()
-            nome_completo = (j.get("nome_completo") or "").lower().strip()
-            
-            if apelido and apelido in nome_busca_lower:
-                return j.get("id")
-            if nome_completo and nome_completo in nome_busca_lower:
-                return j.get("id")
-        
+        return nome_index.buscar(rodada_id, nome_busca)
     except Exception as e:
         print(f"[ERROR] Erro ao buscar jogador por nome: {e}")
     
@@ -315,9 +290,16 @@ def votar(votacao_id: int):
                 flash("Você só pode selecionar até 3 jogadores.", "error")
                 return redirect(url_for("votacoes.votar", votacao_id=votacao_id, rodada_id=rodada_id))
 
-            # Registra votos
-            for jid in selecionados:
-                svc.votar(votacao_id, jogador_votante_id, jid, 1)
+            # Registra votos (em paralelo; a chave da cédula evita voto duplicado em reenvio)
+            cedula_id = request.form.get("cedula_id") or None
+            resultado_cedula = svc.votar_cedula(votacao_id, jogador_votante_id, selecionados, cedula_id)
+            if not resultado_cedula["ok"]:
+                falhas = list(resultado_cedula["falhas"].values())
+                if falhas and not resultado_cedula["registrados"] and isinstance(falhas[0], ApiError):
+                    raise falhas[0]
+                faltam = len(selecionados) - len(resultado_cedula["registrados"])
+                flash(f"{len(resultado_cedula['registrados'])} voto(s) registrado(s), {faltam} falharam. Envie de novo para completar a cédula.", "error")
+                return redirect(url_for("votacoes.votar", votacao_id=votacao_id, rodada_id=rodada_id, cedula=cedula_id))
 
             flash(f"Voto registrado! {len(selecionados)} jogador(es) selecionado(s).", "ok")
         except ApiError as e:
@@ -356,7 +338,60 @@ def votar(votacao_id: int):
     except Exception:
         pass
 
-    return render_template("votacoes/votar.html", votacao_id=votacao_id, rodada_id=rodada_id, posicoes=posicoes, votacao_info=votacao_info)
+    # chave de idempotência da cédula (reaproveitada quando o envio anterior ficou incompleto)
+    cedula_id = request.args.get("cedula") or uuid.uuid4().hex
+
+    return render_template("votacoes/votar.html", votacao_id=votacao_id, rodada_id=rodada_id, posicoes=posicoes, votacao_info=votacao_info, cedula_id=cedula_id)
+
+def _mapa_jogadores_rodada(rodada_id: int) -> dict:
+    """{jogador_id: {"posicao", "foto_url"}} dos jogadores da rodada (posição normalizada para nome)"""
+    jogadores_rodada = rodada_svc.listar_jogadores_rodada(rodada_id)
+    jogadores_map = {}
+    posicoes_map_num = {
+        1: "Goleiro",
+        2: "Zagueiro", 
+        3: "Lateral",
+        4: "Meia",
+        5: "Atacante"
+    }
+    
+    for j in jogadores_rodada.get("jogadores", []):
+        jog_id = j.get("id")
+        if jog_id:
+            # Pega posição de diferentes campos possíveis
+            posicao_raw = j.get("posicao") or j.get("posicao_id")
+            posicao_final = None
+            
+            if posicao_raw is not None:
+                # Se for string, usa diretamente (normaliza capitalização)
+                if isinstance(posicao_raw, str):
+                    posicao_final = posicao_raw.strip()
+                    if posicao_final:
+                        posicao_final = posicao_final[0].upper() + posicao_final[1:].lower()
+                # Se for número, mapeia para nome
+                elif isinstance(posicao_raw, (int, float)):
+                    posicao_final = posicoes_map_num.get(int(posicao_raw))
+            
+            jogadores_map[jog_id] = {
+                "posicao": posicao_final,
+                "foto_url": j.get("foto_url")
+            }
+    return jogadores_map
+
+def _enriquecer_ranking(ranking: list, jogadores_map: dict):
+    """Completa posição e foto dos jogadores do ranking com os dados da rodada"""
+    for item in ranking:
+        jogador = item.get("jogador", {})
+        if jogador and jogador.get("id"):
+            jog_id = jogador.get("id")
+            if jog_id in jogadores_map:
+                jog_info = jogadores_map[jog_id]
+                # Adiciona posição se não existir ou se a existente estiver vazia
+                if jog_info.get("posicao") and (not jogador.get("posicao") or not str(jogador.get("posicao", "")).strip()):
+                    jogador["posicao"] = jog_info["posicao"]
+                # Adiciona foto se não existir
+                if not jogador.get("foto_url") and jog_info.get("foto_url"):
+                    jogador["foto_url"] = jog_info["foto_url"]
 
 @votacoes_bp.route("/votacoes/<int:votacao_id>/resultado")
 def resultado(votacao_id: int):
@@ -394,52 +429,7 @@ def resultado(votacao_id: int):
         # Enriquece o ranking com informações de posição dos jogadores (se rodada_id disponível)
         if rodada_id:
             try:
-                # Busca todos os jogadores da rodada para pegar posições
-                jogadores_rodada = rodada_svc.listar_jogadores_rodada(int(rodada_id))
-                jogadores_map = {}
-                posicoes_map_num = {
-                    1: "Goleiro",
-                    2: "Zagueiro", 
-                    3: "Lateral",
-                    4: "Meia",
-                    5: "Atacante"
-                }
-                
-                for j in jogadores_rodada.get("jogadores", []):
-                    jog_id = j.get("id")
-                    if jog_id:
-                        # Pega posição de diferentes campos possíveis
-                        posicao_raw = j.get("posicao") or j.get("posicao_id")
-                        posicao_final = None
-                        
-                        if posicao_raw is not None:
-                            # Se for string, usa diretamente (normaliza capitalização)
-                            if isinstance(posicao_raw, str):
-                                posicao_final = posicao_raw.strip()
-                                if posicao_final:
-                                    posicao_final = posicao_final[0].upper() + posicao_final[1:].lower()
-                            # Se for número, mapeia para nome
-                            elif isinstance(posicao_raw, (int, float)):
-                                posicao_final = posicoes_map_num.get(int(posicao_raw))
-                        
-                        jogadores_map[jog_id] = {
-                            "posicao": posicao_final,
-                            "foto_url": j.get("foto_url")
-                        }
-                
-                # Enriquece o ranking com posições
-                for item in ranking:
-                    jogador = item.get("jogador", {})
-                    if jogador and jogador.get("id"):
-                        jog_id = jogador.get("id")
-                        if jog_id in jogadores_map:
-                            jog_info = jogadores_map[jog_id]
-                            # Adiciona posição se não existir ou se a existente estiver vazia
-                            if jog_info.get("posicao") and (not jogador.get("posicao") or not str(jogador.get("posicao", "")).strip()):
-                                jogador["posicao"] = jog_info["posicao"]
-                            # Adiciona foto se não existir
-                            if not jogador.get("foto_url") and jog_info.get("foto_url"):
-                                jogador["foto_url"] = jog_info["foto_url"]
+                _enriquecer_ranking(ranking, _mapa_jogadores_rodada(int(rodada_id)))
             except Exception as e:
                 print(f"[WARN] Erro ao enriquecer ranking com posições: {e}")
         
@@ -520,6 +510,45 @@ def resultado(votacao_id: int):
         # Senão, vai pra página inicial
         return redirect("/")
 
+@votacoes_bp.route("/votacoes/<int:votacao_id>/resultado/stream")
+def resultado_stream(votacao_id: int):
+    """
+    Resultado ao vivo (Server-Sent Events). Quem assiste a mesma votação com o mesmo token
+    (ou anônimo) compartilha um único poller (services/votacao_ao_vivo.py); cada conexão só lê do canal.
+    """
+    rodada_id = request.args.get("rodada_id", type=int) or _find_rodada_id_for_votacao(votacao_id)
+    try:
+        # confere o acesso de quem está assistindo antes de entrar no canal compartilhado
+        data = svc.obter_resultado(votacao_id)
+    except ApiError as e:
+        return jsonify(e.payload), e.status_code
+    if not rodada_id:
+        rodada_id = (data.get("votacao") or {}).get("rodada_id")
+
+    app = current_app._get_current_object()
+    base_url = request.host_url
+    jogadores = {}
+
+    def renderizar(resultado: dict) -> str:
+        ranking = resultado.get("resultado", [])
+        with app.test_request_context("/", base_url=base_url):
+            if rodada_id:
+                try:
+                    if not jogadores:
+                        jogadores.update(_mapa_jogadores_rodada(int(rodada_id)))
+                    _enriquecer_ranking(ranking, jogadores)
+                except Exception as e:
+                    print(f"[WARN] Erro ao enriquecer ranking com posições: {e}")
+            html = render_template("votacoes/_resultado_ranking.html", ranking=ranking,
+                                   votacao_id=votacao_id, rodada_id=rodada_id)
+        return json.dumps({"html": html, "total_votos": resultado.get("total_votos", 0)})
+
+    nome, fila = votacao_ao_vivo.assinar(votacao_id, renderizar)
+    resp = Response(ao_vivo.stream(nome, fila), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx não pode segurar o stream em buffer
+    return resp
+
 @votacoes_bp.route("/rodadas/<int:rodada_id>/votacoes/resultados")
 def resultados_rodada(rodada_id: int):
     """Mostra resultados de TODAS as votações de uma rodada"""
@@ -608,34 +637,6 @@ def encerrar(votacao_id: int):
         return redirect(url_for("votacoes.resultado", votacao_id=votacao_id, rodada_id=rodada_id))
     return redirect(url_for("votacoes.resultado", votacao_id=votacao_id))
 
-def _download_image(url: str, referer: str = None) -> bytes:
-    """Baixa uma imagem de uma URL"""
-    headers = {"User-Agent": "Mozilla/5.0 (python-uploader)"}
-    if referer:
-        headers["Referer"] = referer
-    r = requests.get(url, headers=headers, timeout=45, allow_redirects=True)
-    r.raise_for_status()
-    if not r.content:
-        raise RuntimeError(f"Download vazio: {url}")
-    return r.content
-
-def _to_png_rgba(img_bytes: bytes) -> bytes:
-    """Converte imagem para PNG RGBA"""
-    img = Image.open(BytesIO(img_bytes)).convert("RGBA")
-    out = BytesIO()
-    img.save(out, format="PNG", optimize=True)
-    return out.getvalue()
-
-def _resize_mask_to_base(mask_png: bytes, base_png: bytes) -> bytes:
-    """Ajusta o tamanho da máscara para o mesmo tamanho da imagem base"""
-    base = Image.open(BytesIO(base_png)).convert("RGBA")
-    mask = Image.open(BytesIO(mask_png)).convert("RGBA")
-    if mask.size != base.size:
-        mask = mask.resize(base.size, Image.BILINEAR)
-    out = BytesIO()
-    mask.save(out, format="PNG", optimize=True)
-    return out.getvalue()
-
 @votacoes_bp.route("/votacoes/<int:votacao_id>/gerar-imagem", methods=["POST"])
 def gerar_imagem(votacao_id: int):
     """Gera imagem do jogador/goleiro da noite usando n8n"""
@@ -666,46 +667,7 @@ def gerar_imagem(votacao_id: int):
         # Isso é necessário para identificar goleiros corretamente
         if rodada_id:
             try:
-                jogadores_rodada = rodada_svc.listar_jogadores_rodada(int(rodada_id))
-                jogadores_map = {}
-                posicoes_map_num = {
-                    1: "Goleiro",
-                    2: "Zagueiro", 
-                    3: "Lateral",
-                    4: "Meia",
-                    5: "Atacante"
-                }
-                
-                for j in jogadores_rodada.get("jogadores", []):
-                    jog_id = j.get("id")
-                    if jog_id:
-                        posicao_raw = j.get("posicao") or j.get("posicao_id")
-                        posicao_final = None
-                        
-                        if posicao_raw is not None:
-                            if isinstance(posicao_raw, str):
-                                posicao_final = posicao_raw.strip()
-                                if posicao_final:
-                                    posicao_final = posicao_final[0].upper() + posicao_final[1:].lower()
-                            elif isinstance(posicao_raw, (int, float)):
-                                posicao_final = posicoes_map_num.get(int(posicao_raw))
-                        
-                        jogadores_map[jog_id] = {
-                            "posicao": posicao_final,
-                            "foto_url": j.get("foto_url")
-                        }
-                
-                # Enriquece o ranking com posições
-                for item in ranking:
-                    jogador = item.get("jogador", {})
-                    if jogador and jogador.get("id"):
-                        jog_id = jogador.get("id")
-                        if jog_id in jogadores_map:
-                            jog_info = jogadores_map[jog_id]
-                            if jog_info.get("posicao") and (not jogador.get("posicao") or not str(jogador.get("posicao", "")).strip()):
-                                jogador["posicao"] = jog_info["posicao"]
-                            if not jogador.get("foto_url") and jog_info.get("foto_url"):
-                                jogador["foto_url"] = jog_info["foto_url"]
+                _enriquecer_ranking(ranking, _mapa_jogadores_rodada(int(rodada_id)))
             except Exception as e:
                 print(f"[WARN] Erro ao enriquecer ranking com posições: {e}")
         
@@ -837,119 +799,23 @@ def gerar_imagem(votacao_id: int):
         else:
             image_1_url = f"http://192.168.18.162:5001/{foto_url}"
         
-        # URL da imagem máscara (fixa)
-        IMAGE_2_URL = "https://xvideosgostosas.com/wp-content/uploads/2025/12/Gemini_Generated_Image_ml4n5bml4n5bml4n.png"
-        
         # Pega o nome do jogador
         nome_jogador = jogador_selecionado.get("apelido") or jogador_selecionado.get("nome_completo") or "Jogador"
         
-        # Configurações do n8n
-        WEBHOOK_URL = "https://xai.aurora5.com/v1/gemini-edit-image"
-        PROMPT = "faça um edit estilo neon"
-        REFERER = "https://xvideosgostosas.com/"
-        TIMEOUT = 45
-        
-        # Baixa as imagens
-        print(f"⬇️  Baixando imagens...")
-        img1_bytes = _download_image(image_1_url)
-        img2_bytes = _download_image(IMAGE_2_URL, REFERER)
-        
-        # Converte para PNG RGBA
-        print(f"🎨 Convertendo para PNG RGBA...")
-        base_png = _to_png_rgba(img1_bytes)
-        mask_png_raw = _to_png_rgba(img2_bytes)
-        
-        # Ajusta máscara para o mesmo tamanho
-        print(f"📐 Ajustando mask para o mesmo tamanho da imagem base...")
-        mask_png = _resize_mask_to_base(mask_png_raw, base_png)
-        
-        # Prepara arquivos para upload
-        files = {
-            "image": ("image.png", BytesIO(base_png), "image/png"),
-            "mask": ("mask.png", BytesIO(mask_png), "image/png"),
-        }
-        
-        # Payload com nome do jogador
-        data = {
-            "prompt": PROMPT,
-            "nome_jogador": nome_jogador,
-            "tipo": tipo_imagem  # "jogador" ou "goleiro"
-        }
-        
-        # Envia para o n8n
-        print(f"🚀 Enviando para o n8n...")
-        resp = requests.post(
-            WEBHOOK_URL,
-            files=files,
-            data=data,
-            timeout=TIMEOUT
-        )
+        # Downloads + Pillow + webhook podem levar minutos: roda num job em background
+        job_id = jobs.enfileirar("gerar_imagem", gerar_imagem_svc.gerar, image_1_url, nome_jogador, tipo_imagem,
+                                 dono=escopo_atual())
+        print(f"[DEBUG] Geração de imagem enfileirada: job {job_id}")
         
-        print(f"⬅️  Status: {resp.status_code}")
-        
-        # Verifica se é uma requisição AJAX
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.is_json:
-            if resp.status_code == 200:
-                # O n8n retorna binary, converte para base64
-                if resp.content:
-                    try:
-                        # Tenta detectar se é JSON primeiro
-                        try:
-                            json_data = resp.json()
-                            # Se for JSON, pode ter a imagem em algum campo
-                            if isinstance(json_data, dict) and 'image' in json_data:
-                                image_data = json_data['image']
-                                if isinstance(image_data, str):
-                                    # Se já for base64
-                                    if image_data.startswith('data:image'):
-                                        return jsonify({
-                                            "success": True,
-                                            "image": image_data
-                                        })
-                                    else:
-                                        # Assume que é base64 sem prefixo
-                                        return jsonify({
-                                            "success": True,
-                                            "image": f"data:image/png;base64,{image_data}"
-                                        })
-                        except:
-                            pass
-                        
-                        # Se não for JSON, assume que é binary
-                        image_base64 = base64.b64encode(resp.content).decode('utf-8')
-                        return jsonify({
-                            "success": True,
-                            "image": f"data:image/png;base64,{image_base64}"
-                        })
-                    except Exception as e:
-                        print(f"[ERROR] Erro ao processar imagem: {e}")
-                        return jsonify({
-                            "success": False,
-                            "error": f"Erro ao processar imagem: {str(e)}"
-                        }), 500
-                else:
-                    return jsonify({
-                        "success": False,
-                        "error": "Resposta vazia do servidor"
-                    }), 500
-            else:
-                error_msg = "Erro ao gerar imagem"
-                try:
-                    error_data = resp.json()
-                    error_msg = error_data.get("error", error_msg)
-                except:
-                    error_msg = f"Erro {resp.status_code}: {resp.text[:200]}"
-                
-                return jsonify({
-                    "success": False,
-                    "error": error_msg
-                }), resp.status_code
-        
-        # Se não for AJAX, mantém o comportamento antigo
-        if resp.status_code == 200:
-            flash("Imagem gerada com sucesso!", "ok")
-        else:
-            flash(f"Erro ao gerar imagem: {resp.status_code}", "error")
+            return jsonify({
+                "success": True,
+                "job_id": job_id,
+                "status": jobs.PENDENTE,
+                "status_url": url_for("votacoes.status_imagem", job_id=job_id)
+            }), 202
+        
+        flash("Imagem enviada para geração", "ok")
         
     except Exception as e:
         print(f"[ERROR] Erro ao gerar imagem: {e}")
@@ -968,3 +834,30 @@ def gerar_imagem(votacao_id: int):
     if rodada_id:
         return redirect(url_for("votacoes.resultado", votacao_id=votacao_id, rodada_id=rodada_id))
     return redirect(url_for("votacoes.resultado", votacao_id=votacao_id))
+
+@votacoes_bp.route("/votacoes/imagens/<job_id>")
+def status_imagem(job_id: str):
+    """Status do job de geração de imagem (consultado pelo resultado.html até terminar)"""
+    job = jobs.obter(job_id, dono=escopo_atual())
+    if job is None:
+        return jsonify({"success": False, "status": None, "error": "Job não encontrado ou expirado"}), 404
+    if job["status"] == jobs.ERRO:
+        return jsonify({"success": False, "status": job["status"], "error": job["erro"]})
+    if job["status"] == jobs.CONCLUIDO:
+        return jsonify({
+            "success": True,
+            "status": job["status"],
+            "image": url_for("votacoes.imagem_gerada", job_id=job_id)
+        })
+    return jsonify({"success": True, "status": job["status"]})
+
+@votacoes_bp.route("/votacoes/imagens/<job_id>/imagem")
+def imagem_gerada(job_id: str):
+    """Imagem pronta de um job concluído"""
+    job = jobs.obter(job_id, dono=escopo_atual())
+    if job is None or job["status"] != jobs.CONCLUIDO:
+        return ("Not found", 404)
+    resultado = job["resultado"]
+    resp = Response(resultado["conteudo"], mimetype=resultado["content_type"])
+    resp.headers["Cache-Control"] = "private, max-age=900"
+    return resp
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from services import pelada_service as svc
+from services.api_client import ApiError
+from services.cache import escopo_atual
+from services.fanout import em_paralelo
+
+# Resolução de acesso às peladas da listagem (/peladas).
+#   ACESSO_NEGADO_TTL       -> por quanto tempo um 403 fica memorizado por usuário
+#   ACESSO_MAX_CONCORRENCIA -> quantas sondagens de perfil rodam ao mesmo tempo
+#   ACESSO_NEGADOS_MAX      -> pares (usuário, pelada) negados mantidos em memória (LRU)
+ACESSO_NEGADO_TTL = int(os.environ.get("ACESSO_NEGADO_TTL", "300"))
+ACESSO_MAX_CONCORRENCIA = int(os.environ.get("ACESSO_MAX_CONCORRENCIA", "4"))
+ACESSO_NEGADOS_MAX = int(os.environ.get("ACESSO_NEGADOS_MAX", "4096"))
+
+_lock = threading.Lock()
+_negados = OrderedDict()  # (escopo, pelada_id) -> expira_em (ordem de inserção = ordem de expiração)
+
+def _negado(escopo: str, pelada_id) -> bool:
+    with _lock:
+        expira_em = _negados.get((escopo, pelada_id))
+        if expira_em is None:
+            return False
+        if expira_em < time.monotonic():
+            del _negados[(escopo, pelada_id)]
+            return False
+        return True
+
+def _memorizar_negado(escopo: str, pelada_id):
+    agora = time.monotonic()
+    with _lock:
+        _negados.pop((escopo, pelada_id), None)
+        _negados[(escopo, pelada_id)] = agora + ACESSO_NEGADO_TTL
+        # TTL fixo: os expirados estão no começo; acima do limite sai o mais antigo
+        while _negados:
+            chave, expira_em = next(iter(_negados.items()))
+            if expira_em > agora and len(_negados) <= ACESSO_NEGADOS_MAX:
+                break
+            del _negados[chave]
+
+def _sondar(escopo: str, pelada_id) -> bool:
+    """Tenta abrir o perfil: 403 = sem acesso (memorizado); outros erros deixam passar"""
+    try:
+        svc.perfil_pelada(pelada_id)
+        return True
+    except ApiError as e:
+        if e.status_code == 403:
+            _memorizar_negado(escopo, pelada_id)
+            return False
+        return True
+
+def filtrar_peladas_acessiveis(peladas: list, usuario_id=None) -> list:
+    """
+    Mantém só as peladas que o usuário pode acessar, preservando a ordem.
+    - com usuario_id e usuario_gerente_id: compara direto (sem chamada à API)
+    - 403 recentes do mesmo usuário: descarta sem chamada à API
+    - o restante é sondado via perfil_pelada em paralelo (limitado)
+    """
+    escopo = escopo_atual()
+    decisao = {}
+    sondar = {}
+    for pelada in peladas:
+        pelada_id = pelada.get("id")
+        if usuario_id and pelada.get("usuario_gerente_id"):
+            decisao[pelada_id] = pelada.get("usuario_gerente_id") == usuario_id
+        elif _negado(escopo, pelada_id):
+            decisao[pelada_id] = False
+        else:
+            sondar[pelada_id] = (lambda pid=pelada_id: _sondar(escopo, pid))
+
+    decisao.update(em_paralelo(sondar, max_concorrencia=ACESSO_MAX_CONCORRENCIA))
+    return [p for p in peladas if decisao.get(p.get("id"))]
@@ -0,0 +1,83 @@
+import json
+import os
+import queue
+import threading
+
+# Pub/sub em memória para páginas ao vivo (Server-Sent Events).
+# Cada canal (ex: "votacao:12") guarda o último valor de cada evento, para quem entra
+# receber o estado atual na hora, e repassa as publicações para as filas dos assinantes.
+#   AO_VIVO_HEARTBEAT -> segundos entre comentários ": ping" (mantém proxies/conexão abertos)
+AO_VIVO_HEARTBEAT = int(os.environ.get("AO_VIVO_HEARTBEAT", "15"))
+FILA_MAX = 32
+
+_lock = threading.Lock()
+_canais = {}  # canal -> {"filas": set[Queue], "ultimo": {evento: dados}}
+
+def assinar(canal: str, inicial: dict | None = None) -> queue.Queue:
+    """`inicial`: {evento: dados} conhecidos pelo publicador, usados se o canal ainda não tiver esses eventos"""
+    fila = queue.Queue(maxsize=FILA_MAX)
+    with _lock:
+        c = _canais.setdefault(canal, {"filas": set(), "ultimo": {}})
+        c["filas"].add(fila)
+        for evento, dados in (inicial or {}).items():
+            c["ultimo"].setdefault(evento, dados)
+        for evento, dados in c["ultimo"].items():
+            fila.put_nowait((evento, dados))
+    return fila
+
+def cancelar(canal: str, fila: queue.Queue):
+    with _lock:
+        c = _canais.get(canal)
+        if not c:
+            return
+        c["filas"].discard(fila)
+        if not c["filas"]:
+            del _canais[canal]
+
+def assinantes(canal: str) -> int:
+    with _lock:
+        c = _canais.get(canal)
+        return len(c["filas"]) if c else 0
+
+def publicar(canal: str, evento: str, dados: str):
+    """Envia para todos os assinantes do canal (sem assinantes, não guarda nada)"""
+    with _lock:
+        c = _canais.get(canal)
+        if not c:
+            return
+        c["ultimo"][evento] = dados
+        filas = list(c["filas"])
+    for fila in filas:
+        try:
+            fila.put_nowait((evento, dados))
+        except queue.Full:
+            # cliente lento: descarta o mais antigo (só o estado mais recente importa)
+            try:
+                fila.get_nowait()
+                fila.put_nowait((evento, dados))
+            except (queue.Empty, queue.Full):
+                pass
+
+def formatar_sse(evento: str, dados) -> str:
+    if not isinstance(dados, str):
+        dados = json.dumps(dados)
+    linhas = "".join(f"data: {linha}\n" for linha in dados.split("\n"))
+    return f"event: {evento}\n{linhas}\n"
+
+def stream(canal: str, fila: queue.Queue):
+    """Gerador para Response(mimetype="text/event-stream"); cancela a assinatura quando o cliente sai"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                evento, dados = fila.get(timeout=AO_VIVO_HEARTBEAT)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            yield formatar_sse(evento, dados)
+    finally:
+        cancelar(canal, fila)
+
+def ao_vivo_stats() -> dict:
+    with _lock:
+        return {"canais": len(_canais), "assinantes": sum(len(c["filas"]) for c in _canais.values())}
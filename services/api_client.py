@@ -1,23 +1,140 @@
+import os
+import threading
+from contextlib import contextmanager
 import requests
-from flask import session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import session, has_request_context
 
 API_BASE = "http://192.168.18.38:5001"
 
+# Chave da sessão onde auth_service guarda o usuário (me); descartada em qualquer 401
+SESSION_ME_KEY = "me"
+
+# Pool de conexões HTTP (keep-alive) compartilhado pelo processo todo.
+# Configurável por variáveis de ambiente:
+#   API_POOL_HOSTS    -> quantos hosts distintos mantêm pool (pool_connections)
+#   API_POOL_MAXSIZE  -> conexões mantidas abertas por host (pool_maxsize)
+#   API_POOL_BLOCK    -> "1" bloqueia quando o limite por host é atingido (em vez de abrir conexão extra)
+#   API_RETRIES       -> tentativas extras em GET/HEAD/OPTIONS (nunca em POST/PUT/DELETE)
+#   API_BACKOFF       -> backoff_factor entre tentativas (0.3 -> 0.3s, 0.6s, 1.2s...)
+API_POOL_HOSTS = int(os.environ.get("API_POOL_HOSTS", "4"))
+API_POOL_MAXSIZE = int(os.environ.get("API_POOL_MAXSIZE", "16"))
+API_POOL_BLOCK = os.environ.get("API_POOL_BLOCK", "0") == "1"
+API_RETRIES = int(os.environ.get("API_RETRIES", "2"))
+API_BACKOFF = float(os.environ.get("API_BACKOFF", "0.3"))
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+def _get_adapter() -> HTTPAdapter:
+    """Adapter único (e thread-safe) que guarda o pool de conexões do urllib3"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                retry = Retry(
+                    total=API_RETRIES,
+                    connect=API_RETRIES,
+                    read=API_RETRIES,
+                    status=API_RETRIES,
+                    backoff_factor=API_BACKOFF,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+                    raise_on_status=False,
+                )
+                _adapter = HTTPAdapter(
+                    pool_connections=API_POOL_HOSTS,
+                    pool_maxsize=API_POOL_MAXSIZE,
+                    pool_block=API_POOL_BLOCK,
+                    max_retries=retry,
+                )
+    return _adapter
+
+def get_http_session() -> requests.Session:
+    """
+    Sessão HTTP da thread atual. Cada thread tem seu próprio requests.Session
+    (cookies/headers não são compartilhados), mas todas usam o mesmo adapter,
+    então as conexões keep-alive do pool são reaproveitadas entre threads e requisições.
+    """
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        adapter = _get_adapter()
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        s.headers["Connection"] = "keep-alive"
+        _local.session = s
+    return s
+
+def pool_stats() -> dict:
+    """Métricas do pool: conexões abertas x requisições feitas (reuso = requisições - conexões)"""
+    adapter = _get_adapter()
+    hosts = []
+    total_conexoes = 0
+    total_requisicoes = 0
+    pools = adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        conexoes = getattr(pool, "num_connections", 0)
+        requisicoes = getattr(pool, "num_requests", 0)
+        total_conexoes += conexoes
+        total_requisicoes += requisicoes
+        hosts.append({
+            "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+            "conexoes_abertas": conexoes,
+            "requisicoes": requisicoes,
+            "reusos": max(0, requisicoes - conexoes),
+        })
+    return {
+        "pool_maxsize": API_POOL_MAXSIZE,
+        "pool_block": API_POOL_BLOCK,
+        "retries_get": API_RETRIES,
+        "conexoes_abertas": total_conexoes,
+        "requisicoes": total_requisicoes,
+        "reusos": max(0, total_requisicoes - total_conexoes),
+        "hosts": hosts,
+    }
+
 class ApiError(Exception):
     def __init__(self, status_code: int, payload: dict | None = None):
         super().__init__(payload.get("erro") if isinstance(payload, dict) and payload.get("erro") else f"API error {status_code}")
         self.status_code = status_code
         self.payload = payload or {}
 
-def api(method: str, path: str, json=None, params=None):
-    headers = {"Content-Type": "application/json"}
-    token = session.get("access_token")
+_token_local = threading.local()
+
+@contextmanager
+def com_token(token: str | None):
+    """Usa `token` nas chamadas desta thread (threads de background que agem em nome de um usuário)"""
+    anterior = getattr(_token_local, "token", None)
+    _token_local.token = token
+    try:
+        yield
+    finally:
+        _token_local.token = anterior
+
+def token_atual() -> str | None:
+    """Token do usuário logado (None fora de uma requisição ou se anônimo)"""
+    token = getattr(_token_local, "token", None)
+    if token:
+        return token
+    if not has_request_context():
+        return None
+    return session.get("access_token")
+
+def api(method: str, path: str, json=None, params=None, headers=None):
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    token = token_atual()
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
     url = API_BASE + path
     print(f"[API] {method} {url} params={params}")  # DEBUG
-    r = requests.request(method, url, json=json, params=params, headers=headers, timeout=20)
+    r = get_http_session().request(method, url, json=json, params=params, headers=headers, timeout=20)
     print(f"[API] Status: {r.status_code}")  # DEBUG
 
     try:
@@ -26,6 +143,9 @@ def api(method: str, path: str, json=None, params=None):
         print(f"[API] Error parsing JSON: {e}, text: {r.text[:200]}")  # DEBUG
         data = {"erro": "Resposta inválida da API", "raw": r.text}
 
+    if r.status_code == 401 and has_request_context():
+        session.pop(SESSION_ME_KEY, None)
+
     if r.status_code >= 400:
         print(f"[API] Error response: {data}")  # DEBUG
         raise ApiError(r.status_code, data if isinstance(data, dict) else {"erro": "Erro", "data": data})
@@ -34,14 +154,14 @@ def api(method: str, path: str, json=None, params=None):
 def api_upload(method: str, path: str, files=None, data=None, params=None):
     """API call for file uploads (FormData)"""
     headers = {}
-    token = session.get("access_token")
+    token = token_atual()
     if token:
         headers["Authorization"] = f"Bearer {token}"
     # NÃO definir Content-Type - o requests define automaticamente com boundary para multipart/form-data
 
     url = API_BASE + path
     print(f"[API] {method} {url} (upload) files={list(files.keys()) if files else None} data={data}")  # DEBUG
-    r = requests.request(method, url, files=files, data=data, params=params, headers=headers, timeout=30)
+    r = get_http_session().request(method, url, files=files, data=data, params=params, headers=headers, timeout=30)
     print(f"[API] Status: {r.status_code}")  # DEBUG
     print(f"[API] Request Content-Type: {r.request.headers.get('Content-Type', 'N/A')}")  # DEBUG
 
@@ -51,6 +171,9 @@ def api_upload(method: str, path: str, files=None, data=None, params=None):
         print(f"[API] Error parsing JSON: {e}, text: {r.text[:200]}")  # DEBUG
         response_data = {"erro": "Resposta inválida da API", "raw": r.text}
 
+    if r.status_code == 401 and has_request_context():
+        session.pop(SESSION_ME_KEY, None)
+
     if r.status_code >= 400:
         print(f"[API] Error response: {response_data}")  # DEBUG
         raise ApiError(r.status_code, response_data if isinstance(response_data, dict) else {"erro": "Erro", "data": response_data})
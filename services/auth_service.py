@@ -1,4 +1,10 @@
-from services.api_client import api
+import os
+import time
+from flask import session, g, has_request_context
+from services.api_client import api, SESSION_ME_KEY
+
+# Por quanto tempo o usuário (me) guardado na sessão é considerado válido
+ME_TTL = int(os.environ.get("ME_TTL", "600"))
 
 def login(username: str, senha: str):
     return api("POST", "/api/usuarios/login", json={"username": username, "password": senha})
@@ -6,8 +12,32 @@ def login(username: str, senha: str):
 def register(email: str, senha: str, nome: str):
     return api("POST", "/api/usuarios/registrar", json={"username": nome, "email": email, "password": senha})
 
-def me():
-    return api("GET", "/api/usuarios/me")
+def me(forcar: bool = False):
+    """
+    Usuário autenticado, com cache em dois níveis:
+    - por requisição (flask.g): várias chamadas na mesma requisição = no máximo 1 ida à API
+    - por sessão (cookie): reaproveitado entre requisições por ME_TTL segundos
+    Um 401 descarta o cache (ver api_client) e a próxima chamada busca de novo.
+    """
+    if has_request_context() and not forcar and g.get("_me") is not None:
+        return g._me
+
+    cache = session.get(SESSION_ME_KEY) if has_request_context() else None
+    if not forcar and isinstance(cache, dict) and cache.get("expira_em", 0) > time.time():
+        dados = cache.get("dados")
+    else:
+        dados = api("GET", "/api/usuarios/me")
+        if has_request_context():
+            session[SESSION_ME_KEY] = {"dados": dados, "expira_em": time.time() + ME_TTL}
+
+    if has_request_context():
+        g._me = dados
+    return dados
+
+def usuario_sessao() -> dict:
+    """Dados do usuário logado (campo "usuario" de me())"""
+    data = me()
+    return data.get("usuario", {}) if isinstance(data, dict) else {}
 
 def refresh(refresh_token: str):
     # se sua API exigir refresh via header Bearer, adapte aqui
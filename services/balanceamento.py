@@ -0,0 +1,227 @@
+import bisect
+import heapq
+import math
+import os
+from services import ranking_service as rank_svc
+from services import rodada_service as rodada_svc
+from services import votacao_service as votacao_svc
+from services import estatisticas
+from services.fanout import em_paralelo
+
+# Sorteio de times equilibrados para montar a rodada.
+# Cada jogador recebe uma "força" a partir dos números da temporada (gols, assistências e
+# pontos nas votações), normalizados pelo maior valor do grupo. Os times saem de um guloso
+# (mais forte primeiro, sempre para o time mais fraco com vaga) refinado por busca local:
+# trocas de um jogador por outro entre dois times enquanto a variância das somas cair.
+#   BALANCEAMENTO_MAX_RODADAS -> rodadas recentes consultadas para somar pontos de votação
+BALANCEAMENTO_MAX_RODADAS = int(os.environ.get("BALANCEAMENTO_MAX_RODADAS", "20"))
+PESOS = {"gols": 1.0, "assistencias": 0.7, "votos": 0.5}
+FORCA_BASE = 1.0  # jogador sem números na temporada não vale zero
+MAX_TROCAS = 10000
+
+def forcas(jogador_ids: list, numeros: dict, pesos: dict = None) -> dict:
+    """
+    {jogador_id: força}. `numeros` é {"gols": {id: n}, "assistencias": {id: n}, "votos": {id: n}};
+    cada estatística é dividida pelo maior valor entre os jogadores do grupo.
+    """
+    pesos = pesos or PESOS
+    resultado = {j: FORCA_BASE for j in jogador_ids}
+    for nome, peso in pesos.items():
+        valores = numeros.get(nome) or {}
+        maximo = max((valores.get(j, 0) for j in jogador_ids), default=0)
+        if not maximo or not peso:
+            continue
+        for j in jogador_ids:
+            resultado[j] += peso * valores.get(j, 0) / maximo
+    return resultado
+
+def _vagas(total: int, quantidade_times: int, jogadores_por_time: int | None) -> list:
+    if jogadores_por_time:
+        return [jogadores_por_time] * quantidade_times
+    # sem limite: distribui todo mundo, times com no máximo 1 jogador de diferença
+    base, sobra = divmod(total, quantidade_times)
+    return [base + (1 if i < sobra else 0) for i in range(quantidade_times)]
+
+def guloso(forca: dict, quantidade_times: int, jogadores_por_time: int | None = None) -> tuple:
+    """(times, reservas): mais forte primeiro, sempre para o time de menor soma que ainda tem vaga"""
+    ordem = sorted(forca, key=lambda j: (-forca[j], j))
+    vagas = _vagas(len(ordem), quantidade_times, jogadores_por_time)
+    escalados, reservas = ordem[:sum(vagas)], ordem[sum(vagas):]
+    times = [[] for _ in range(quantidade_times)]
+    heap = [(0.0, i) for i in range(quantidade_times) if vagas[i] > 0]
+    heapq.heapify(heap)
+    for j in escalados:
+        soma, i = heapq.heappop(heap)
+        times[i].append(j)
+        if len(times[i]) < vagas[i]:
+            heapq.heappush(heap, (soma + forca[j], i))
+    return times, reservas
+
+def _melhor_troca(forca: dict, maior: list, menor_ordenado: tuple, diferenca: float):
+    """
+    Troca (a de `maior`, b de `menor`) que mais reduz a variância: trocar a por b move
+    d = f(a) - f(b) de um time para o outro, e o ganho é máximo com d perto de diferenca/2.
+    `menor_ordenado` é (valores, ids) do time menor, ordenado por força. Devolve (ganho, a, b) ou None.
+    """
+    alvo = diferenca / 2
+    valores, ids = menor_ordenado
+    melhor = None
+    for a in maior:
+        k = bisect.bisect_left(valores, forca[a] - alvo)
+        for idx in (k - 1, k):
+            if 0 <= idx < len(valores):
+                d = forca[a] - valores[idx]
+                # variação da soma dos quadrados = 2d(d - diferenca): melhora se 0 < d < diferenca
+                ganho = 2 * d * (diferenca - d)
+                if ganho > 1e-12 and (melhor is None or ganho > melhor[0]):
+                    melhor = (ganho, a, ids[idx])
+    return melhor
+
+def busca_local(forca: dict, times: list, max_trocas: int = MAX_TROCAS) -> int:
+    """
+    Aplica trocas entre pares de times até não haver melhora; devolve nº de trocas.
+    Cada passo tenta primeiro o par (mais forte, mais fraco), depois os pares com um dos dois
+    e só então todos os pares. A melhor troca de cada par fica guardada até um dos dois times
+    mudar, então a varredura completa só recalcula os pares afetados pelas últimas trocas.
+    """
+    somas = [sum(forca[j] for j in t) for t in times]
+
+    def _ordenado(t):
+        ids = sorted(t, key=lambda j: forca[j])
+        return [forca[j] for j in ids], ids
+
+    ordenados = [_ordenado(t) for t in times]
+    guardadas = {}  # (i, k) -> melhor troca do par (ou None)
+
+    def _par(i, k):
+        if (i, k) not in guardadas:
+            guardadas[(i, k)] = (
+                _melhor_troca(forca, times[i], ordenados[k], somas[i] - somas[k]) if somas[i] > somas[k] else None
+            )
+        return guardadas[(i, k)]
+
+    n = len(times)
+    todos = [(i, k) for i in range(n) for k in range(n) if i != k]
+    trocas = 0
+    while trocas < max_trocas:
+        i_max = max(range(n), key=somas.__getitem__)
+        i_min = min(range(n), key=somas.__getitem__)
+        extremos = [(i_max, k) for k in range(n) if k != i_max] + [(i, i_min) for i in range(n) if i not in (i_max, i_min)]
+        melhor = None
+        for pares in ([(i_max, i_min)], extremos, todos):
+            for i, k in pares:
+                troca = _par(i, k)
+                if troca and (melhor is None or troca[0] > melhor[0]):
+                    melhor = troca + (i, k)
+            if melhor is not None:
+                break
+        if melhor is None:
+            break
+        _ganho, a, b, i, k = melhor
+        times[i][times[i].index(a)] = b
+        times[k][times[k].index(b)] = a
+        ordenados[i] = _ordenado(times[i])
+        ordenados[k] = _ordenado(times[k])
+        d = forca[a] - forca[b]
+        somas[i] -= d
+        somas[k] += d
+        trocas += 1
+        for par in [p for p in guardadas if i in p or k in p]:
+            del guardadas[par]
+    return trocas
+
+def desvio(forca: dict, times: list) -> float:
+    """Desvio padrão das somas de força dos times (0 = perfeitamente equilibrado)"""
+    somas = [sum(forca[j] for j in t) for t in times]
+    if not somas:
+        return 0.0
+    media = sum(somas) / len(somas)
+    return math.sqrt(sum((s - media) ** 2 for s in somas) / len(somas))
+
+def sortear(forca: dict, quantidade_times: int, jogadores_por_time: int | None = None) -> dict:
+    """
+    Times equilibrados a partir de {jogador_id: força}:
+        {"times": [[jogador_id, ...], ...], "reservas": [...], "somas": [...], "desvio": float, "trocas": int}
+    Com mais jogadores do que vagas, os de menor força ficam como reservas.
+    """
+    if quantidade_times < 1:
+        raise ValueError("quantidade_times deve ser >= 1")
+    times, reservas = guloso(forca, quantidade_times, jogadores_por_time)
+    trocas = busca_local(forca, times)
+    for t in times:
+        t.sort(key=lambda j: -forca[j])
+    return {
+        "times": times,
+        "reservas": reservas,
+        "somas": [round(sum(forca[j] for j in t), 3) for t in times],
+        "desvio": desvio(forca, times),
+        "trocas": trocas,
+    }
+
+def _votos_rodada(rodada_id: int) -> dict:
+    try:
+        data = votacao_svc.obter_resultados_rodada(rodada_id)
+    except Exception as e:
+        print(f"[WARN] Balanceamento: resultados da rodada {rodada_id}: {e}")
+        return {}
+    votacoes = data if isinstance(data, list) else (data or {}).get("votacoes", []) if isinstance(data, dict) else []
+    pontos = {}
+    for v in votacoes:
+        for item in (v.get("resultado") or []) if isinstance(v, dict) else []:
+            jogador = item.get("jogador") if isinstance(item, dict) else None
+            if isinstance(jogador, dict) and jogador.get("id"):
+                pontos[jogador["id"]] = pontos.get(jogador["id"], 0) + int(item.get("total_pontos") or 0)
+    return pontos
+
+def _votos_temporada(temporada_id: int) -> dict:
+    rodadas = rodada_svc.listar_rodadas(temporada_id, page=1, per_page=BALANCEAMENTO_MAX_RODADAS)
+    ids = [r["id"] for r in (rodadas or {}).get("data", []) if isinstance(r, dict) and r.get("id")]
+    por_rodada = em_paralelo({r: (lambda r=r: _votos_rodada(r)) for r in ids}, max_concorrencia=6)
+    total = {}
+    for pontos in por_rodada.values():
+        for jogador_id, p in pontos.items():
+            total[jogador_id] = total.get(jogador_id, 0) + p
+    return total
+
+def estatisticas_temporada(temporada_id: int) -> dict:
+    """Gols, assistências e pontos de votação por jogador na temporada (rankings vêm do cache)"""
+    def _seguro(fn):
+        def _chamar():
+            try:
+                return fn()
+            except Exception as e:
+                print(f"[WARN] Balanceamento: estatísticas da temporada {temporada_id}: {e}")
+                return {}
+        return _chamar
+
+    resultados = em_paralelo({
+        "gols": _seguro(lambda: estatisticas.por_jogador(estatisticas.coluna(rank_svc.ranking_artilheiros(temporada_id, limit=1000), "gols"))),
+        "assistencias": _seguro(lambda: estatisticas.por_jogador(estatisticas.coluna(rank_svc.ranking_assistencias(temporada_id, limit=1000), "assistencias"))),
+        "votos": _seguro(lambda: _votos_temporada(temporada_id)),
+    })
+    return resultados
+
+if __name__ == "__main__":
+    # Benchmark: equilíbrio (desvio das somas) x tempo, guloso puro vs guloso + trocas vs aleatório
+    #   python -m services.balanceamento
+    import random
+    import time
+
+    rng = random.Random(42)
+    print(f"{'jogadores':>9} {'times':>5} | {'aleatório':>10} | {'guloso':>10} {'ms':>7} | {'+trocas':>10} {'ms':>7} {'trocas':>6}")
+    for n, k in ((20, 4), (60, 6), (200, 10), (500, 20), (1000, 40)):
+        forca = {j: FORCA_BASE + rng.paretovariate(2.5) for j in range(n)}
+        ids = list(forca)
+        rng.shuffle(ids)
+        aleatorio = [ids[i::k] for i in range(k)]
+
+        t0 = time.perf_counter()
+        times, _ = guloso(forca, k)
+        t_guloso = (time.perf_counter() - t0) * 1000
+        d_guloso = desvio(forca, times)
+
+        t0 = time.perf_counter()
+        r = sortear(forca, k)
+        t_total = (time.perf_counter() - t0) * 1000
+
+        print(f"{n:>9} {k:>5} | {desvio(forca, aleatorio):>10.4f} | {d_guloso:>10.4f} {t_guloso:>7.2f} | {r['desvio']:>10.6f} {t_total:>7.2f} {r['trocas']:>6}")
@@ -0,0 +1,188 @@
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import g, has_app_context
+from services.api_client import token_atual
+
+# Cache em memória (por processo) para chamadas de leitura da API.
+#   CACHE_ENABLED      -> "0" desliga o cache (útil para debug)
+#   CACHE_MAX_ENTRIES  -> limite de entradas (LRU: remove a menos usada)
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "512"))
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> (expira_em, tags, valor)
+_stats = {"evictions": 0, "invalidacoes": 0, "endpoints": {}}
+_geracao = 0  # incrementa a cada invalidação (evita guardar resposta lida antes de uma escrita)
+_ouvintes = []  # callbacks chamados com as tags invalidadas (índices em memória fora deste cache)
+
+def escopo_atual() -> str:
+    """Chaves são separadas por usuário (hash do token) ou 'anon' para acesso público"""
+    token = token_atual()
+    if not token:
+        return "anon"
+    return hashlib.sha1(token.encode("utf-8")).hexdigest()[:16]
+
+def _contar(endpoint: str, campo: str):
+    ep = _stats["endpoints"].setdefault(endpoint, {"hits": 0, "misses": 0})
+    ep[campo] += 1
+
+def obter(key):
+    with _lock:
+        item = _entries.get(key)
+        if item is None:
+            return None, False
+        expira_em, _tags, valor = item
+        if expira_em < time.monotonic():
+            del _entries[key]
+            return None, False
+        _entries.move_to_end(key)
+        return copy.deepcopy(valor), True
+
+def guardar(key, valor, ttl: float, tags=(), geracao: int | None = None):
+    with _lock:
+        if geracao is not None and geracao != _geracao:
+            return
+        _entries[key] = (time.monotonic() + ttl, frozenset(tags), copy.deepcopy(valor))
+        _entries.move_to_end(key)
+        while len(_entries) > CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+def invalidar(*tags: str):
+    """Remove todas as entradas (de todos os usuários) marcadas com qualquer uma das tags"""
+    global _geracao
+    alvo = {t for t in tags if t}
+    if not alvo:
+        return
+    if has_app_context():
+        g.pop("_memo_request", None)  # leituras repetidas depois de uma escrita voltam à API
+    with _lock:
+        _geracao += 1
+        remover = [k for k, (_exp, etags, _v) in _entries.items() if etags & alvo]
+        for k in remover:
+            del _entries[k]
+        _stats["invalidacoes"] += len(remover)
+    for ouvinte in list(_ouvintes):
+        try:
+            ouvinte(alvo)
+        except Exception as e:
+            print(f"[WARN] Cache: ouvinte de invalidação falhou: {e}")
+
+def ao_invalidar(callback):
+    """Registra callback(tags: set) chamado a cada invalidar() — para índices próprios seguirem as escritas"""
+    _ouvintes.append(callback)
+    return callback
+
+def limpar():
+    global _geracao
+    with _lock:
+        _geracao += 1
+        _entries.clear()
+
+def cached(endpoint: str, ttl: float, tags=()):
+    """
+    Decorator para funções de leitura dos services.
+
+    `tags` são templates formatados com os argumentos da chamada, ex:
+        @cached("obter_temporada", ttl=300, tags=("temporada:{temporada_id}",))
+    As escritas chamam `invalidar("temporada:7")` para descartar o que ficou velho.
+    Exceções (ApiError etc) nunca são cacheadas.
+    """
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return fn(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (endpoint, escopo_atual(), tuple(bound.arguments.items()))
+            valor, hit = obter(key)
+            with _lock:
+                _contar(endpoint, "hits" if hit else "misses")
+                geracao = _geracao
+            if hit:
+                return valor
+            valor = fn(*args, **kwargs)
+            guardar(key, valor, ttl, [t.format(**bound.arguments) for t in tags], geracao=geracao)
+            return valor
+        return wrapper
+    return decorator
+
+def invalida(*tags):
+    """
+    Decorator para funções de escrita: após a chamada (com sucesso ou erro),
+    invalida as tags formatadas com os argumentos, ex:
+        @invalida("partida:{partida_id}", "ranking")
+    """
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                invalidar(*[t.format(**bound.arguments) for t in tags])
+        return wrapper
+    return decorator
+
+def por_request(endpoint: str):
+    """
+    Memo do request atual (flask.g): a mesma chamada (endpoint + argumentos) vai à API
+    no máximo uma vez por request, ex:
+        @por_request("listar_jogadores_rodada")
+    Útil para leituras que não podem ficar velhas entre requests mas se repetem dentro de um.
+    Fora de um request (jobs em background) chama direto.
+    """
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not has_app_context():
+                return fn(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (endpoint, tuple(bound.arguments.items()))
+            memo = g.setdefault("_memo_request", {})
+            dedup = g.setdefault("_memo_dedup", {})
+            if key in memo:
+                dedup[endpoint] = dedup.get(endpoint, 0) + 1
+                return copy.deepcopy(memo[key])
+            valor = fn(*args, **kwargs)
+            memo[key] = copy.deepcopy(valor)
+            return valor
+        return wrapper
+    return decorator
+
+def memo_request_stats() -> dict:
+    """Chamadas deduplicadas no request atual, por endpoint"""
+    if not has_app_context():
+        return {}
+    return dict(g.get("_memo_dedup") or {})
+
+def cache_stats() -> dict:
+    with _lock:
+        endpoints = {k: dict(v) for k, v in _stats["endpoints"].items()}
+        hits = sum(v["hits"] for v in endpoints.values())
+        misses = sum(v["misses"] for v in endpoints.values())
+        return {
+            "habilitado": CACHE_ENABLED,
+            "entradas": len(_entries),
+            "max_entradas": CACHE_MAX_ENTRIES,
+            "hits": hits,
+            "misses": misses,
+            "evictions": _stats["evictions"],
+            "invalidacoes": _stats["invalidacoes"],
+            "endpoints": endpoints,
+        }
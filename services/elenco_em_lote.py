@@ -0,0 +1,110 @@
+from services import time_service as time_svc
+from services import time_jogadores_index as time_index
+from services.fanout import em_paralelo
+
+# Montagem de elencos em lote: recebe o elenco desejado de um ou mais times, compara com o
+# elenco atual e aplica só as diferenças, em paralelo. Remoções vão numa primeira leva
+# (jogador trocando de time precisa sair do antigo antes de entrar no novo); entradas e
+# mudanças de posição/capitão vão na segunda.
+#   elenco: {time_id: {jogador_id: {"capitao": bool, "posicao": str | None}}}
+#   (no desejado, capitao/posicao podem faltar: valem os atuais)
+
+def elenco_do_time(time: dict | None) -> dict:
+    """Elenco atual no formato acima, a partir de obter_time()["time"]"""
+    elenco = {}
+    for j in (time or {}).get("jogadores") or []:
+        if isinstance(j, dict) and j.get("id"):
+            elenco[int(j["id"])] = {"capitao": bool(j.get("capitao")), "posicao": j.get("posicao") or None}
+    return elenco
+
+def diferenca(atual: dict, desejado: dict) -> dict:
+    """{"remover": [(time_id, jogador_id)], "adicionar": [(time_id, jogador_id, dados)], "atualizar": [...]}"""
+    ops = {"remover": [], "adicionar": [], "atualizar": []}
+    for time_id, elenco in desejado.items():
+        elenco_atual = atual.get(time_id, {})
+        for jogador_id in elenco_atual.keys() - elenco.keys():
+            ops["remover"].append((time_id, jogador_id))
+        for jogador_id, dados in elenco.items():
+            antes = elenco_atual.get(jogador_id)
+            # campos ausentes (ex: elenco vindo do sorteio) mantêm o valor atual
+            dados = {**(antes or {"capitao": False, "posicao": None}), **dados}
+            if antes is None:
+                ops["adicionar"].append((time_id, jogador_id, dados))
+            elif antes != dados:
+                ops["atualizar"].append((time_id, jogador_id, dados))
+    return ops
+
+def _executar(chamadas: dict) -> dict:
+    """em_paralelo que não para no primeiro erro: {nome: exceção} das que falharam"""
+    def _protegida(fn):
+        def _chamar():
+            try:
+                fn()
+            except Exception as e:
+                return e
+            return None
+        return _chamar
+    resultados = em_paralelo({nome: _protegida(fn) for nome, fn in chamadas.items()})
+    return {nome: erro for nome, erro in resultados.items() if erro is not None}
+
+def aplicar(ops: dict) -> list:
+    """Aplica as operações de diferenca(); devolve [(op, time_id, jogador_id, erro)] das que falharam"""
+    falhas = []
+
+    def _remover(time_id, jogador_id):
+        time_svc.remover_jogador(time_id, jogador_id)
+        time_index.liberar(time_id, jogador_id)
+
+    def _adicionar(time_id, jogador_id, dados):
+        time_svc.adicionar_jogador(time_id, jogador_id, dados["capitao"], dados["posicao"])
+        time_index.atribuir(time_id, jogador_id)
+
+    def _atualizar(time_id, jogador_id, dados):
+        time_svc.atualizar_jogador_time(time_id, jogador_id, dados["posicao"], capitao=dados["capitao"])
+
+    erros = _executar({
+        ("remover", t, j): (lambda t=t, j=j: _remover(t, j))
+        for t, j in ops["remover"]
+    })
+    falhas += [(op, t, j, e) for (op, t, j), e in erros.items()]
+    # jogador que não saiu do time antigo não entra no novo
+    presos = {j for (_op, _t, j, _e) in falhas}
+
+    chamadas = {}
+    for t, j, dados in ops["adicionar"]:
+        if j in presos:
+            falhas.append(("adicionar", t, j, None))
+            continue
+        chamadas[("adicionar", t, j)] = lambda t=t, j=j, d=dados: _adicionar(t, j, d)
+    for t, j, dados in ops["atualizar"]:
+        chamadas[("atualizar", t, j)] = lambda t=t, j=j, d=dados: _atualizar(t, j, d)
+    erros = _executar(chamadas)
+    falhas += [(op, t, j, e) for (op, t, j), e in erros.items()]
+    return falhas
+
+def sincronizar(desejado: dict, demais_times=()) -> dict:
+    """
+    Lê o elenco atual dos times de `desejado` (em paralelo, via cache), aplica a diferença
+    e devolve {"ops": contagem por tipo, "falhas": [...], "times": {time_id: time atualizado}}.
+    `demais_times`: outros times da temporada, fora da seleção; jogadores de `desejado` que
+    estiverem em algum deles saem de lá (senão ficariam em dois times). O resto do elenco fica.
+    """
+    demais = [t for t in demais_times if t not in desejado]
+    ids = list(desejado) + demais
+    times = em_paralelo({t: (lambda t=t: time_svc.obter_time(t).get("time")) for t in ids})
+    atual = {t: elenco_do_time(times[t]) for t in ids}
+    escalados = {j for elenco in desejado.values() for j in elenco}
+    desejado = dict(desejado)
+    for t in demais:
+        desejado[t] = {j: {} for j in atual[t] if j not in escalados}
+    ops = diferenca(atual, desejado)
+    falhas = aplicar(ops) if any(ops.values()) else []
+    # releitura só dos times que mudaram (as escritas invalidaram o cache deles)
+    mudaram = {op[0] for lista in ops.values() for op in lista}
+    if mudaram:
+        times.update(em_paralelo({t: (lambda t=t: time_svc.obter_time(t).get("time")) for t in mudaram}))
+    return {
+        "ops": {tipo: len(lista) for tipo, lista in ops.items()},
+        "falhas": falhas,
+        "times": times,
+    }
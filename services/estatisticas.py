@@ -0,0 +1,194 @@
+import heapq
+from collections import Counter
+from itertools import chain
+from operator import itemgetter
+
+# Estatísticas de temporada por jogador para rankings/scout.
+# O payload de ranking da API é lido uma única vez (com os fallbacks de campo) para
+#   {"totais": {jogador_id: int}, "jogadores": {id: jogador}, "sem_jogador": int}
+# e a partir daí totais, somas entre temporadas e top-N trabalham só com esse dict.
+# "sem_jogador" guarda o que veio em itens sem jogador (entra no total, não no ranking).
+# A soma entre temporadas é um loop sobre dict.items(): medido contra arrays de ids/valores
+# e contra Counter.update, foi o mais rápido (ver o benchmark no fim do arquivo).
+
+def lista_ranking(data) -> list:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get("ranking", [])
+    return []
+
+def _inteiro(valor) -> int | None:
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+def coluna(data, campo: str) -> dict:
+    """
+    Normaliza um ranking (artilheiros: campo="gols", assistências: campo="assistencias").
+    Valor de cada item: jogador.total_<campo>, senão item.<campo>, senão item.total_<campo>.
+    Ids que não viram int (ex: "abc") contam como item sem jogador.
+    """
+    total_campo = f"total_{campo}"
+    totais = {}
+    get = totais.get
+    jogadores = {}
+    sem_jogador = 0
+    for item in lista_ranking(data):
+        if isinstance(item, (int, float)):
+            sem_jogador += int(item)
+            continue
+        if not isinstance(item, dict):
+            continue
+        jogador = item.get("jogador")
+        if not isinstance(jogador, dict):
+            jogador = {}
+        qtd = jogador.get(total_campo) or item.get(campo) or item.get(total_campo) or 0
+        qtd = (_inteiro(qtd) or 0) if qtd else 0
+        jogador_id = _inteiro(jogador.get("id"))
+        if not jogador_id:
+            sem_jogador += qtd
+            continue
+        # um jogador pode aparecer mais de uma vez no payload
+        totais[jogador_id] = get(jogador_id, 0) + qtd
+        jogadores.setdefault(jogador_id, jogador)
+    return {"totais": totais, "jogadores": jogadores, "sem_jogador": sem_jogador}
+
+def vazia() -> dict:
+    return {"totais": {}, "jogadores": {}, "sem_jogador": 0}
+
+def total(col: dict) -> int:
+    return sum(col["totais"].values()) + col["sem_jogador"]
+
+def por_jogador(col: dict) -> dict:
+    """{jogador_id: soma}"""
+    return dict(col["totais"])
+
+def somar(colunas: list) -> dict:
+    """Soma por jogador entre várias colunas (ex: temporadas); o jogador vem da primeira em que aparece"""
+    if not colunas:
+        return vazia()
+    totais = dict(colunas[0]["totais"])
+    get = totais.get
+    for col in colunas[1:]:
+        for jogador_id, valor in col["totais"].items():
+            totais[jogador_id] = get(jogador_id, 0) + valor
+    jogadores = {}
+    for col in reversed(colunas):
+        jogadores.update(col["jogadores"])
+    return {
+        "totais": totais,
+        "jogadores": jogadores,
+        "sem_jogador": sum(col["sem_jogador"] for col in colunas),
+    }
+
+def top(col: dict, n: int | None = None) -> list:
+    """[(jogador_id, valor)] em ordem decrescente (empates na ordem de entrada); n=None devolve todos"""
+    pares = col["totais"].items()
+    if n is None:
+        return sorted(pares, key=itemgetter(1), reverse=True)
+    return heapq.nlargest(n, pares, key=itemgetter(1))
+
+def titulos(listas_ids) -> dict:
+    """
+    Coluna de títulos a partir das listas de campeões por temporada
+    (quantas vezes cada jogador aparece; ids inválidos são ignorados).
+    """
+    ids = (_inteiro(j) for j in chain.from_iterable(listas_ids))
+    return {"totais": dict(Counter(j for j in ids if j)), "jogadores": {}, "sem_jogador": 0}
+
+if __name__ == "__main__":
+    # Benchmark: 10k jogadores x 50 temporadas (payloads sintéticos no formato da API).
+    # O scout memoriza o agregado de temporadas encerradas, então a comparação justa é entre
+    # agregados já memorizados: o formato anterior ({id: {"jogador", "total_gols"}} + sort
+    # completo) contra o atual. A normalização só entra na temporada ativa.
+    #   python -m services.estatisticas
+    import random
+    import time
+    from array import array
+
+    JOGADORES, TEMPORADAS, TOP_N = 10_000, 50, 10
+    rng = random.Random(7)
+    jogadores = [{"id": i, "apelido": f"J{i}"} for i in range(1, JOGADORES + 1)]
+    formatos = (
+        lambda j, q: {"jogador": {**j, "total_gols": q}},
+        lambda j, q: {"jogador": j, "gols": q},
+        lambda j, q: {"jogador": j, "total_gols": q},
+    )
+    payloads = [
+        {"ranking": [rng.choice(formatos)(j, rng.randint(0, 30)) for j in jogadores]}
+        for _ in range(TEMPORADAS)
+    ]
+
+    def agregado_anterior(data):
+        # formato memorizado pelo scout_service antes deste módulo
+        gols = {}
+        for item in lista_ranking(data):
+            jogador = item.get("jogador", {}) if isinstance(item, dict) else {}
+            jogador_id = jogador.get("id") if isinstance(jogador, dict) else None
+            if not jogador_id:
+                continue
+            qtd = (jogador.get("total_gols") if isinstance(jogador, dict) else None) or item.get("gols") or item.get("total_gols") or 0
+            qtd = int(qtd) if qtd else 0
+            atual = gols.setdefault(jogador_id, {"jogador": jogador, "total_gols": 0})
+            atual["total_gols"] += qtd
+        return gols
+
+    def antes(agregados):
+        consolidado = {}
+        for agregado in agregados:
+            for jogador_id, item in agregado.items():
+                atual = consolidado.setdefault(jogador_id, {"jogador": item["jogador"], "total_gols": 0})
+                atual["total_gols"] += item["total_gols"]
+        ranking = sorted(consolidado.values(), key=lambda x: x["total_gols"], reverse=True)
+        return [(x["jogador"]["id"], x["total_gols"]) for x in ranking[:TOP_N]]
+
+    def depois(colunas):
+        return top(somar(colunas), TOP_N)
+
+    def com_arrays(colunas):
+        # alternativa descartada: ids/valores em array("q") somados com zip
+        totais = {}
+        get = totais.get
+        for ids, valores in colunas:
+            for jogador_id, valor in zip(ids, valores):
+                totais[jogador_id] = get(jogador_id, 0) + valor
+        return heapq.nlargest(TOP_N, totais.items(), key=itemgetter(1))
+
+    def com_counter(colunas):
+        # alternativa descartada: Counter.update (soma item a item em Python por dentro)
+        totais = Counter()
+        for col in colunas:
+            totais.update(col["totais"])
+        return heapq.nlargest(TOP_N, totais.items(), key=itemgetter(1))
+
+    def medir(fn, *args, repeticoes=7):
+        melhor = None
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            resultado = fn(*args)
+            dt = (time.perf_counter() - t0) * 1000
+            melhor = dt if melhor is None else min(melhor, dt)
+        return resultado, melhor
+
+    anteriores, t_norm_antes = medir(lambda: [agregado_anterior(d) for d in payloads], repeticoes=3)
+    colunas, t_norm = medir(lambda: [coluna(d, "gols") for d in payloads], repeticoes=3)
+    arrays = [(array("q", c["totais"].keys()), array("q", c["totais"].values())) for c in colunas]
+    r_antes, t_antes = medir(antes, anteriores)
+    r_depois, t_depois = medir(depois, colunas)
+    r_arrays, t_arrays = medir(com_arrays, arrays)
+    r_counter, t_counter = medir(com_counter, colunas)
+    _, t_titulos = medir(lambda: titulos(rng.sample(range(1, JOGADORES + 1), 8) for _ in range(TEMPORADAS)))
+
+    assert r_antes == r_depois == r_arrays == r_counter, (r_antes, r_depois, r_arrays, r_counter)
+    print(f"{JOGADORES} jogadores x {TEMPORADAS} temporadas ({JOGADORES * TEMPORADAS} itens), top {TOP_N}")
+    print("  normalizar os payloads (só temporada ativa):")
+    print(f"    formato anterior:                           {t_norm_antes:8.1f} ms")
+    print(f"    formato atual:                              {t_norm:8.1f} ms")
+    print("  somar + top a partir dos agregados memorizados:")
+    print(f"    formato anterior (setdefault + sort):       {t_antes:8.1f} ms")
+    print(f"    formato atual (dict.items + nlargest):      {t_depois:8.1f} ms")
+    print(f"    arrays de ids/valores (zip):                {t_arrays:8.1f} ms")
+    print(f"    Counter.update:                             {t_counter:8.1f} ms")
+    print(f"  títulos ({TEMPORADAS} listas de campeões):              {t_titulos:8.2f} ms")
@@ -0,0 +1,79 @@
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool limitado de threads para disparar chamadas independentes à API em paralelo.
+# FANOUT_MAX_WORKERS deve ficar <= API_POOL_MAXSIZE para não abrir conexões extras.
+FANOUT_MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "8"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_MAX_WORKERS, thread_name_prefix="fanout")
+    return _executor
+
+def _run_in_worker(ctx: contextvars.Context, fn):
+    # marca a thread como worker para evitar fan-out aninhado (deadlock com pool limitado)
+    _local.worker = True
+    try:
+        return ctx.run(fn)
+    finally:
+        _local.worker = False
+
+def em_paralelo(chamadas: dict, max_concorrencia: int | None = None) -> dict:
+    """
+    Executa chamadas independentes em paralelo e devolve {nome: resultado}.
+
+    `chamadas` é um dict {nome: callable sem argumentos}, ex:
+        em_paralelo({
+            "rodada": lambda: rodada_svc.obter_rodada(rodada_id),
+            "partidas": lambda: partida_svc.listar_partidas(rodada_id),
+        })
+
+    Cada chamada roda com uma cópia do contexto atual (contextvars), então
+    `session`/`g` do Flask continuam acessíveis e o token do usuário é enviado.
+    Se alguma chamada falhar, a primeira exceção (na ordem do dict) é relançada
+    depois que todas terminarem, igual ao comportamento sequencial.
+    `max_concorrencia` limita quantas chamadas deste lote rodam ao mesmo tempo.
+    """
+    if not chamadas:
+        return {}
+
+    # Uma chamada só, ou já estamos dentro de um worker: executa em sequência
+    if len(chamadas) == 1 or getattr(_local, "worker", False):
+        return {nome: fn() for nome, fn in chamadas.items()}
+
+    executor = _get_executor()
+    itens = list(chamadas.items())
+    limite = max_concorrencia or len(itens)
+    pendentes = []
+    resultados = {}
+    erros = {}
+
+    def _coletar(nome, fut):
+        try:
+            resultados[nome] = fut.result()
+        except Exception as e:
+            erros[nome] = e
+
+    for nome, fn in itens:
+        if len(pendentes) >= limite:
+            n, f = pendentes.pop(0)
+            _coletar(n, f)
+        fut = executor.submit(_run_in_worker, contextvars.copy_context(), fn)
+        pendentes.append((nome, fut))
+
+    for nome, fut in pendentes:
+        _coletar(nome, fut)
+
+    for nome, _ in itens:
+        if nome in erros:
+            raise erros[nome]
+    return resultados
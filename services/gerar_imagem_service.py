@@ -0,0 +1,136 @@
+import base64
+import binascii
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image
+from services.api_client import get_http_session
+
+# Geração da imagem do jogador/goleiro da noite (edit via webhook de IA).
+# Roda dentro de um job (services/jobs.py), fora do request.
+#   IMAGEM_WEBHOOK_URL -> endpoint que recebe image/mask/prompt (aponte p/ um stub local em testes)
+#   MASCARA_TTL        -> segundos até baixar a máscara (IMAGE_2_URL) de novo
+#   MASCARA_MAX_TAMANHOS -> quantos tamanhos de máscara já redimensionada ficam guardados (LRU)
+#   IMAGEM_PNG_OPTIMIZE  -> "1" usa optimize=True nos PNGs enviados (bem mais lento; o webhook não precisa)
+IMAGEM_WEBHOOK_URL = os.environ.get("IMAGEM_WEBHOOK_URL", "https://xai.aurora5.com/v1/gemini-edit-image")
+IMAGE_2_URL = "https://xvideosgostosas.com/wp-content/uploads/2025/12/Gemini_Generated_Image_ml4n5bml4n5bml4n.png"
+REFERER = "https://xvideosgostosas.com/"
+PROMPT = "faça um edit estilo neon"
+TIMEOUT = 45
+MASCARA_TTL = int(os.environ.get("MASCARA_TTL", "86400"))
+MASCARA_MAX_TAMANHOS = int(os.environ.get("MASCARA_MAX_TAMANHOS", "16"))
+IMAGEM_PNG_OPTIMIZE = os.environ.get("IMAGEM_PNG_OPTIMIZE", "0") == "1"
+
+_mascara_lock = threading.Lock()
+_mascara = {"imagem": None, "baixada_em": 0.0}  # máscara original já decodificada (RGBA)
+_mascaras_por_tamanho = OrderedDict()            # ((largura, altura), otimizar) -> PNG pronto para envio
+
+def _download_image(url: str, referer: str = None) -> bytes:
+    """Baixa uma imagem de uma URL"""
+    headers = {"User-Agent": "Mozilla/5.0 (python-uploader)"}
+    if referer:
+        headers["Referer"] = referer
+    r = get_http_session().get(url, headers=headers, timeout=TIMEOUT, allow_redirects=True)
+    r.raise_for_status()
+    if not r.content:
+        raise RuntimeError(f"Download vazio: {url}")
+    return r.content
+
+# As etapas trabalham com PIL.Image em memória; cada imagem é decodificada uma vez
+# e codificada uma vez, só na hora de montar o upload.
+def _decodificar_rgba(img_bytes: bytes) -> Image.Image:
+    img = Image.open(BytesIO(img_bytes))
+    return img if img.mode == "RGBA" else img.convert("RGBA")
+
+def _codificar_png(img: Image.Image, otimizar: bool = IMAGEM_PNG_OPTIMIZE) -> bytes:
+    out = BytesIO()
+    # sem optimize o zlib roda uma vez só (optimize testa várias estratégias de compressão)
+    img.save(out, format="PNG", optimize=otimizar)
+    return out.getvalue()
+
+def _mascara_original() -> Image.Image:
+    """Máscara fixa baixada e decodificada uma vez (renova após MASCARA_TTL)"""
+    # chamado com _mascara_lock: downloads simultâneos viram um só
+    if _mascara["imagem"] is None or time.monotonic() - _mascara["baixada_em"] > MASCARA_TTL:
+        img = _decodificar_rgba(_download_image(IMAGE_2_URL, REFERER))
+        if _mascara["imagem"] is not None:
+            _mascaras_por_tamanho.clear()  # máscara renovada: tamanhos antigos não valem mais
+        _mascara["imagem"] = img
+        _mascara["baixada_em"] = time.monotonic()
+    return _mascara["imagem"]
+
+def _mascara_para(tamanho: tuple[int, int], otimizar: bool = IMAGEM_PNG_OPTIMIZE) -> bytes:
+    """PNG da máscara no tamanho da imagem base; hit não baixa nem redimensiona"""
+    chave = (tamanho, otimizar)
+    with _mascara_lock:
+        png = _mascaras_por_tamanho.get(chave)
+        if png is not None and time.monotonic() - _mascara["baixada_em"] <= MASCARA_TTL:
+            _mascaras_por_tamanho.move_to_end(chave)
+            return png
+        mask = _mascara_original()
+        if mask.size != tamanho:
+            mask = mask.resize(tamanho, Image.BILINEAR)
+        png = _codificar_png(mask, otimizar)
+        _mascaras_por_tamanho[chave] = png
+        while len(_mascaras_por_tamanho) > MASCARA_MAX_TAMANHOS:
+            _mascaras_por_tamanho.popitem(last=False)
+        return png
+
+def _imagem_da_resposta(resp) -> tuple[bytes, str]:
+    """O webhook responde a imagem em binário ou JSON {"image": "<base64 ou data URL>"}"""
+    if not resp.content:
+        raise RuntimeError("Resposta vazia do servidor")
+    try:
+        json_data = resp.json()
+    except ValueError:
+        json_data = None
+    if isinstance(json_data, dict) and isinstance(json_data.get("image"), str):
+        image_data = json_data["image"]
+        content_type = "image/png"
+        if image_data.startswith("data:image"):
+            cabecalho, _, image_data = image_data.partition(",")
+            content_type = cabecalho[len("data:"):].split(";")[0] or content_type
+        try:
+            return base64.b64decode(image_data), content_type
+        except (binascii.Error, ValueError) as e:
+            raise RuntimeError(f"Imagem inválida na resposta: {e}")
+    content_type = resp.headers.get("Content-Type", "image/png").split(";")[0]
+    return resp.content, content_type if content_type.startswith("image/") else "image/png"
+
+def gerar(image_1_url: str, nome_jogador: str, tipo_imagem: str, otimizar_png: bool = IMAGEM_PNG_OPTIMIZE) -> dict:
+    """Baixa foto e máscara, prepara os PNGs e envia ao webhook. Retorna {"conteudo", "content_type"}."""
+    print(f"⬇️  Baixando imagem...")
+    img1_bytes = _download_image(image_1_url)
+
+    print(f"🎨 Convertendo para RGBA...")
+    base = _decodificar_rgba(img1_bytes)
+
+    print(f"📐 Ajustando mask para o mesmo tamanho da imagem base...")
+    mask_png = _mascara_para(base.size, otimizar_png)
+    base_png = _codificar_png(base, otimizar_png)
+
+    files = {
+        "image": ("image.png", BytesIO(base_png), "image/png"),
+        "mask": ("mask.png", BytesIO(mask_png), "image/png"),
+    }
+    data = {
+        "prompt": PROMPT,
+        "nome_jogador": nome_jogador,
+        "tipo": tipo_imagem  # "jogador" ou "goleiro"
+    }
+
+    print(f"🚀 Enviando para o n8n...")
+    resp = get_http_session().post(IMAGEM_WEBHOOK_URL, files=files, data=data, timeout=TIMEOUT)
+    print(f"⬅️  Status: {resp.status_code}")
+
+    if resp.status_code != 200:
+        try:
+            error_msg = resp.json().get("error") or "Erro ao gerar imagem"
+        except Exception:
+            error_msg = f"Erro {resp.status_code}: {resp.text[:200]}"
+        raise RuntimeError(error_msg)
+
+    conteudo, content_type = _imagem_da_resposta(resp)
+    return {"conteudo": conteudo, "content_type": content_type}
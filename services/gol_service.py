@@ -1,7 +1,11 @@
 from services.api_client import api
+from services.cache import invalida
 
+@invalida("partida:{partida_id}", "ranking")
 def criar_gol(partida_id: int, payload: dict):
     return api("POST", f"/api/peladas/partidas/{partida_id}/gols", json=payload)
 
+# o gol não informa a partida: descarta todas as partidas em cache
+@invalida("partida", "ranking")
 def remover_gol(gol_id: int):
     return api("DELETE", f"/api/peladas/gols/{gol_id}")
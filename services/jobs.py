@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Fila de jobs em processo para tarefas lentas (ex: geração de imagem da votação).
+# A rota enfileira e responde na hora; o navegador consulta o status pelo job_id.
+#   JOBS_MAX_WORKERS -> threads executando jobs ao mesmo tempo
+#   JOBS_RESULT_TTL  -> segundos que um job terminado (e seu resultado) fica disponível
+#   JOBS_MAX         -> limite de jobs guardados (remove os terminados mais antigos)
+JOBS_MAX_WORKERS = int(os.environ.get("JOBS_MAX_WORKERS", "2"))
+JOBS_RESULT_TTL = int(os.environ.get("JOBS_RESULT_TTL", "900"))
+JOBS_MAX = int(os.environ.get("JOBS_MAX", "200"))
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+_lock = threading.Lock()
+_jobs = OrderedDict()  # job_id -> job
+_executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOBS_MAX_WORKERS, thread_name_prefix="job")
+    return _executor
+
+def _limpar_expirados():
+    # chamado com _lock
+    agora = time.time()
+    for job_id in [k for k, j in _jobs.items() if j["terminado_em"] and agora - j["terminado_em"] > JOBS_RESULT_TTL]:
+        del _jobs[job_id]
+    terminados = [k for k, j in _jobs.items() if j["terminado_em"]]
+    while len(_jobs) > JOBS_MAX and terminados:
+        del _jobs[terminados.pop(0)]
+
+def _executar(job_id: str, fn, args, kwargs):
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job["status"] = EXECUTANDO
+        job["iniciado_em"] = time.time()
+    try:
+        resultado = fn(*args, **kwargs)
+        status, erro = CONCLUIDO, None
+    except Exception as e:
+        print(f"[JOB] {job_id} ({job['tipo']}) falhou: {e}")
+        traceback.print_exc()
+        resultado, status, erro = None, ERRO, str(e) or type(e).__name__
+    with _lock:
+        job["status"] = status
+        job["resultado"] = resultado
+        job["erro"] = erro
+        job["terminado_em"] = time.time()
+    print(f"[JOB] {job_id} ({job['tipo']}) {status} em {job['terminado_em'] - job['iniciado_em']:.1f}s")
+
+def enfileirar(tipo: str, fn, *args, dono: str | None = None, **kwargs) -> str:
+    """
+    Agenda fn(*args, **kwargs) no pool e devolve o job_id.
+    `fn` roda fora do request: não use session/g dentro dela, passe tudo por argumento.
+    `dono` (ex: cache.escopo_atual()) restringe quem pode consultar o job.
+    """
+    job_id = uuid.uuid4().hex
+    with _lock:
+        _limpar_expirados()
+        _jobs[job_id] = {
+            "id": job_id,
+            "tipo": tipo,
+            "dono": dono,
+            "status": PENDENTE,
+            "resultado": None,
+            "erro": None,
+            "criado_em": time.time(),
+            "iniciado_em": None,
+            "terminado_em": None,
+        }
+    _get_executor().submit(_executar, job_id, fn, args, kwargs)
+    return job_id
+
+def obter(job_id: str, dono: str | None = None) -> dict | None:
+    """Estado atual do job (cópia rasa) ou None se não existe/expirou/é de outro dono"""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or (job["dono"] is not None and job["dono"] != dono):
+            return None
+        return dict(job)
+
+def jobs_stats() -> dict:
+    with _lock:
+        por_status = {}
+        for job in _jobs.values():
+            por_status[job["status"]] = por_status.get(job["status"], 0) + 1
+        return {"max_workers": JOBS_MAX_WORKERS, "jobs": len(_jobs), "por_status": por_status}
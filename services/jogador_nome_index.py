@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from services import rodada_service as rodada_svc
+from services.cache import ao_invalidar
+
+# Índice em memória nome -> jogador_id por rodada, usado para achar o votante pelo nome.
+# Na abertura da votação o grupo inteiro vota junto: o índice evita buscar a lista da rodada
+# na API e normalizar todos os nomes a cada voto.
+#   NOME_INDEX_TTL     -> segundos até reconstruir o índice de uma rodada
+#   NOME_INDEX_MAX     -> rodadas mantidas em memória (LRU)
+NOME_INDEX_TTL = int(os.environ.get("NOME_INDEX_TTL", "120"))
+NOME_INDEX_MAX = int(os.environ.get("NOME_INDEX_MAX", "64"))
+
+_lock = threading.Lock()
+_indices = OrderedDict()  # rodada_id -> (expira_em, indice)
+_locks_rodada = {}        # rodada_id -> Lock (uma construção por rodada por vez)
+
+def normalizar(texto: str | None) -> str:
+    """minúsculas, sem acentos e com espaços colapsados"""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.lower().split())
+
+def _construir(jogadores: list) -> dict:
+    exato = {}
+    nomes = []  # (jogador_id, apelido, nome_completo) normalizados, na ordem da API
+    for j in jogadores:
+        jogador_id = j.get("id")
+        if not jogador_id:
+            continue
+        apelido = normalizar(j.get("apelido"))
+        nome_completo = normalizar(j.get("nome_completo"))
+        for nome in (apelido, nome_completo):
+            # primeiro jogador da lista vence (mesmo critério do match exato anterior)
+            if nome and nome not in exato:
+                exato[nome] = jogador_id
+        nomes.append((jogador_id, apelido, nome_completo))
+    return {"exato": exato, "nomes": nomes}
+
+def _indice(rodada_id: int) -> dict:
+    agora = time.monotonic()
+    with _lock:
+        item = _indices.get(rodada_id)
+        if item and item[0] > agora:
+            _indices.move_to_end(rodada_id)
+            return item[1]
+        lock_rodada = _locks_rodada.setdefault(rodada_id, threading.Lock())
+
+    # single-flight: votos simultâneos da mesma rodada esperam uma única busca na API
+    with lock_rodada:
+        with _lock:
+            item = _indices.get(rodada_id)
+            if item and item[0] > time.monotonic():
+                return item[1]
+        data = rodada_svc.listar_jogadores_rodada(rodada_id)
+        indice = _construir(data.get("jogadores", []) if isinstance(data, dict) else [])
+        with _lock:
+            _indices[rodada_id] = (time.monotonic() + NOME_INDEX_TTL, indice)
+            _indices.move_to_end(rodada_id)
+            while len(_indices) > NOME_INDEX_MAX:
+                antigo, _ = _indices.popitem(last=False)
+                _locks_rodada.pop(antigo, None)
+        return indice
+
+def buscar(rodada_id: int, nome_busca: str):
+    """
+    jogador_id pelo nome (sem diferenciar maiúsculas/acentos) ou None. Ordem de preferência:
+    match exato de apelido/nome, nome contém a busca, busca contém o nome.
+    """
+    busca = normalizar(nome_busca)
+    if not busca:
+        return None
+    indice = _indice(rodada_id)
+    jogador_id = indice["exato"].get(busca)
+    if jogador_id:
+        return jogador_id
+    # elencos de rodada têm dezenas de jogadores: varrer strings já normalizadas é sub-ms
+    for jogador_id, apelido, nome_completo in indice["nomes"]:
+        if busca in apelido or busca in nome_completo:
+            return jogador_id
+    for jogador_id, apelido, nome_completo in indice["nomes"]:
+        if (apelido and apelido in busca) or (nome_completo and nome_completo in busca):
+            return jogador_id
+    return None
+
+def invalidar(rodada_id: int | None = None):
+    with _lock:
+        if rodada_id is None:
+            _indices.clear()
+        else:
+            _indices.pop(rodada_id, None)
+
+@ao_invalidar
+def _ao_invalidar_cache(tags: set):
+    # elenco dos times (adicionar/remover jogador) ou nome de jogador mudou
+    if "times" in tags or any(t.startswith("time:") for t in tags):
+        invalidar()
@@ -1,4 +1,6 @@
 from services.api_client import api, api_upload
+from services.upload_imagem import preparar_upload
+from services.cache import invalida
 
 def listar_jogadores(pelada_id: int, page=1, per_page=50, ativo=None):
     params = {"page": page, "per_page": per_page}
@@ -9,7 +11,7 @@ def listar_jogadores(pelada_id: int, page=1, per_page=50, ativo=None):
 def criar_jogador(pelada_id: int, nome_completo: str, apelido: str | None, telefone: str | None, foto_file=None):
     if foto_file and foto_file.filename:
         # Upload com arquivo
-        files = {"foto": (foto_file.filename, foto_file, foto_file.content_type)}
+        files = {"foto": preparar_upload(foto_file)}
         data = {
             "nome_completo": nome_completo,
             "apelido": apelido or "",
@@ -27,10 +29,12 @@ def criar_jogador(pelada_id: int, nome_completo: str, apelido: str | None, telef
 def obter_jogador(jogador_id: int):
     return api("GET", f"/api/peladas/jogadores/{jogador_id}")
 
+# nome/foto do jogador aparecem embutidos nos times e rankings
+@invalida("times", "ranking")
 def atualizar_jogador(jogador_id: int, payload: dict, foto_file=None):
     if foto_file and foto_file.filename:
         # Upload com arquivo
-        files = {"foto": (foto_file.filename, foto_file, foto_file.content_type)}
+        files = {"foto": preparar_upload(foto_file)}
         data = {}
         for key, value in payload.items():
             if isinstance(value, bool):
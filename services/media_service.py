@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime, formatdate
+from flask import Response, request, send_file
+from services.api_client import API_BASE, get_http_session
+
+# Proxy de imagens do backend com cache em disco.
+#   MEDIA_CACHE_DIR             -> diretório do cache (padrão: <tmp>/pelada_media_cache)
+#   MEDIA_CACHE_MAX_BYTES       -> tamanho máximo do cache; acima disso remove as menos usadas (LRU)
+#   MEDIA_CACHE_TTL             -> segundos até revalidar com o backend (If-None-Match/If-Modified-Since)
+#   MEDIA_ACCEL_REDIRECT_PREFIX -> se definido (ex: "/_media_cache/"), hits do cache são entregues
+#                                  pelo nginx via X-Accel-Redirect (location internal apontando p/ MEDIA_CACHE_DIR)
+MEDIA_CACHE_DIR = os.environ.get("MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pelada_media_cache"))
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get("MEDIA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+MEDIA_CACHE_TTL = int(os.environ.get("MEDIA_CACHE_TTL", "86400"))
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+MAX_AGE_CLIENTE = 86400
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = 20
+
+_lock = threading.Lock()
+_tamanho_total = None  # bytes em cache (calculado na primeira escrita)
+
+def caminhos(chave: str) -> tuple[str, str]:
+    """(arquivo, metadados) no cache para uma chave (subpath ou variante)"""
+    h = hashlib.sha1(chave.encode("utf-8")).hexdigest()
+    pasta = os.path.join(MEDIA_CACHE_DIR, h[:2])
+    return os.path.join(pasta, h), os.path.join(pasta, h + ".json")
+
+def ler_meta(chave: str) -> dict | None:
+    arquivo, meta_path = caminhos(chave)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(arquivo):
+        return None
+    return meta
+
+def _marcar_uso(chave: str):
+    # LRU: o mtime do .json marca o último uso (o mtime do arquivo fica = Last-Modified)
+    _, meta_path = caminhos(chave)
+    try:
+        os.utime(meta_path, None)
+    except OSError:
+        pass
+
+def _gravar_meta(chave: str, meta: dict):
+    _, meta_path = caminhos(chave)
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+def _mtime_de(last_modified: str | None) -> float:
+    if last_modified:
+        try:
+            return parsedate_to_datetime(last_modified).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return time.time()
+
+def guardar(chave: str, tmp_path: str, content_type: str, etag_origem: str | None = None, last_modified: str | None = None):
+    """Move um arquivo temporário já completo para o cache e grava os metadados"""
+    arquivo, _ = caminhos(chave)
+    mtime = _mtime_de(last_modified)
+    os.utime(tmp_path, (mtime, mtime))
+    antigo = os.path.getsize(arquivo) if os.path.exists(arquivo) else 0
+    os.replace(tmp_path, arquivo)
+    _gravar_meta(chave, {
+        "chave": chave,
+        "content_type": content_type,
+        "etag_origem": etag_origem,
+        "last_modified": last_modified or formatdate(mtime, usegmt=True),
+        "validado_em": time.time(),
+    })
+    _contabilizar(os.path.getsize(arquivo) - antigo)
+
+def arquivo_temporario(chave: str):
+    arquivo, _ = caminhos(chave)
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    return tempfile.NamedTemporaryFile(dir=os.path.dirname(arquivo), suffix=".part", delete=False)
+
+def _contabilizar(delta: int):
+    global _tamanho_total
+    with _lock:
+        if _tamanho_total is None:
+            _tamanho_total = _medir_cache()
+        else:
+            _tamanho_total += delta
+        excedeu = _tamanho_total > MEDIA_CACHE_MAX_BYTES
+    if excedeu:
+        _evict()
+
+def _medir_cache() -> int:
+    total = 0
+    for raiz, _dirs, arquivos in os.walk(MEDIA_CACHE_DIR):
+        for nome in arquivos:
+            if "." not in nome:
+                total += os.path.getsize(os.path.join(raiz, nome))
+    return total
+
+def _evict():
+    """Remove as entradas menos usadas até ficar em 90% do limite"""
+    global _tamanho_total
+    with _lock:
+        entradas = []
+        for raiz, _dirs, arquivos in os.walk(MEDIA_CACHE_DIR):
+            for nome in arquivos:
+                if not nome.endswith(".json"):
+                    continue
+                meta_path = os.path.join(raiz, nome)
+                arquivo = meta_path[:-5]
+                try:
+                    entradas.append((os.path.getmtime(meta_path), os.path.getsize(arquivo), arquivo, meta_path))
+                except OSError:
+                    continue
+        total = sum(e[1] for e in entradas)
+        alvo = int(MEDIA_CACHE_MAX_BYTES * 0.9)
+        for _uso, tamanho, arquivo, meta_path in sorted(entradas):
+            if total <= alvo:
+                break
+            for p in (meta_path, arquivo):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= tamanho
+        _tamanho_total = total
+
+def responder_do_cache(chave: str, meta: dict) -> Response:
+    """Entrega um arquivo do cache com ETag/Last-Modified, 304 e Range (via send_file)"""
+    _marcar_uso(chave)
+    arquivo, _ = caminhos(chave)
+    if MEDIA_ACCEL_REDIRECT_PREFIX:
+        rel = os.path.relpath(arquivo, MEDIA_CACHE_DIR).replace(os.sep, "/")
+        resp = Response(status=200)
+        resp.headers["X-Accel-Redirect"] = MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + rel
+        resp.headers["Content-Type"] = meta.get("content_type") or "application/octet-stream"
+        resp.headers["Cache-Control"] = f"public, max-age={MAX_AGE_CLIENTE}"
+        return resp
+    return send_file(
+        arquivo,
+        mimetype=meta.get("content_type") or "application/octet-stream",
+        conditional=True,
+        etag=True,
+        max_age=MAX_AGE_CLIENTE,
+    )
+
+def _requisitar_origem(subpath: str, meta: dict | None = None):
+    headers = {}
+    if meta:
+        if meta.get("etag_origem"):
+            headers["If-None-Match"] = meta["etag_origem"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    # Não envia token de autenticação para permitir acesso público
+    return get_http_session().get(f"{API_BASE}/{subpath}", headers=headers, stream=True, timeout=TIMEOUT)
+
+def baixar_para_cache(subpath: str) -> dict | None:
+    """Garante o original completo no cache (sem streaming para o cliente). Retorna os metadados."""
+    meta = ler_meta(subpath)
+    if meta and time.time() - meta.get("validado_em", 0) < MEDIA_CACHE_TTL:
+        return meta
+    r = _requisitar_origem(subpath, meta)
+    try:
+        if r.status_code == 304 and meta:
+            meta["validado_em"] = time.time()
+            _gravar_meta(subpath, meta)
+            return meta
+        if r.status_code != 200:
+            return meta  # backend fora/erro: usa a cópia antiga se houver
+        tmp = arquivo_temporario(subpath)
+        try:
+            with tmp:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    tmp.write(chunk)
+            guardar(subpath, tmp.name, r.headers.get("Content-Type") or "application/octet-stream",
+                    r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        except Exception:
+            remover(tmp.name)
+            raise
+        return ler_meta(subpath)
+    finally:
+        r.close()
+
+def remover(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _stream_e_cache(subpath: str, r) -> Response:
+    """Repassa o corpo do backend em chunks para o cliente enquanto grava no cache"""
+    content_type = r.headers.get("Content-Type") or "application/octet-stream"
+    etag_origem = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+
+    def gerar():
+        tmp = arquivo_temporario(subpath)
+        completo = False
+        try:
+            with tmp:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    tmp.write(chunk)
+                    yield chunk
+            completo = True
+        finally:
+            r.close()
+            if completo:
+                guardar(subpath, tmp.name, content_type, etag_origem, last_modified)
+            else:
+                remover(tmp.name)
+
+    resp = Response(gerar(), status=200, direct_passthrough=True)
+    resp.headers["Content-Type"] = content_type
+    if r.headers.get("Content-Length"):
+        resp.headers["Content-Length"] = r.headers["Content-Length"]
+    if last_modified:
+        resp.headers["Last-Modified"] = last_modified
+    resp.headers["Cache-Control"] = f"public, max-age={MAX_AGE_CLIENTE}"
+    return resp
+
+def servir(subpath: str) -> Response:
+    meta = ler_meta(subpath)
+    if meta and time.time() - meta.get("validado_em", 0) < MEDIA_CACHE_TTL:
+        return responder_do_cache(subpath, meta)
+
+    # Range em arquivo ainda não cacheado: baixa inteiro e deixa o send_file recortar
+    if request.headers.get("Range"):
+        meta = baixar_para_cache(subpath)
+        if not meta:
+            return Response("Not found", status=404)
+        return responder_do_cache(subpath, meta)
+
+    try:
+        r = _requisitar_origem(subpath, meta)
+    except Exception:
+        if meta:
+            return responder_do_cache(subpath, meta)
+        raise
+
+    if r.status_code == 304 and meta:
+        r.close()
+        meta["validado_em"] = time.time()
+        _gravar_meta(subpath, meta)
+        return responder_do_cache(subpath, meta)
+    if r.status_code != 200:
+        r.close()
+        if meta:
+            return responder_do_cache(subpath, meta)
+        return Response("Not found", status=r.status_code if r.status_code >= 400 else 404)
+    return _stream_e_cache(subpath, r)
@@ -0,0 +1,66 @@
+from PIL import Image, ImageOps
+from flask import Response, request
+from services import media_service
+
+# Variantes redimensionadas das imagens do backend (/media/<variante>/static/...).
+# Largura máxima em px; a altura acompanha a proporção. Pensadas para telas 2x:
+#   thumb -> avatares/escudos pequenos (até w-12 = 48px)
+#   sm    -> avatares/escudos médios (w-14 até w-24 = 96px)
+#   md    -> imagens de destaque em cards
+VARIANTES = {"thumb": 96, "sm": 192, "md": 480}
+QUALIDADE = 80
+
+def _formato_preferido() -> str:
+    return "webp" if "image/webp" in (request.headers.get("Accept") or "") else "jpeg"
+
+def _gerar(origem_path: str, destino, largura: int, formato: str):
+    with Image.open(origem_path) as img:
+        # JPEG: decodifica já em escala reduzida (bem mais rápido que decodificar tudo e reduzir)
+        img.draft("RGB", (largura, largura))
+        img = ImageOps.exif_transpose(img)
+        if img.width > largura:
+            altura = max(1, round(img.height * largura / img.width))
+            img = img.resize((largura, altura), Image.LANCZOS, reducing_gap=2.0)
+        tem_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if formato == "webp":
+            img = img.convert("RGBA" if tem_alpha else "RGB")
+            img.save(destino, format="WEBP", quality=QUALIDADE, method=4)
+        else:
+            if tem_alpha:
+                # JPEG não tem transparência: aplica sobre fundo branco
+                rgba = img.convert("RGBA")
+                fundo = Image.new("RGB", rgba.size, (255, 255, 255))
+                fundo.paste(rgba, mask=rgba.getchannel("A"))
+                img = fundo
+            else:
+                img = img.convert("RGB")
+            img.save(destino, format="JPEG", quality=QUALIDADE, optimize=True, progressive=True)
+
+def servir_variante(variante: str, subpath: str) -> Response:
+    largura = VARIANTES[variante]
+    meta_original = media_service.baixar_para_cache(subpath)
+    if not meta_original:
+        return Response("Not found", status=404)
+
+    formato = _formato_preferido()
+    chave = f"{variante}/{formato}/{subpath}"
+    meta = media_service.ler_meta(chave)
+    # variante só vale se foi gerada a partir da versão atual do original
+    if not meta or meta.get("last_modified") != meta_original.get("last_modified"):
+        origem_path, _ = media_service.caminhos(subpath)
+        tmp = media_service.arquivo_temporario(chave)
+        try:
+            with tmp:
+                _gerar(origem_path, tmp, largura, formato)
+        except Exception as e:
+            # não é imagem que o Pillow entenda (svg etc): entrega o original
+            print(f"[WARN] Variante {variante} de {subpath} falhou: {e}")
+            tmp.close()
+            media_service.remover(tmp.name)
+            return media_service.responder_do_cache(subpath, meta_original)
+        media_service.guardar(chave, tmp.name, f"image/{formato}", None, meta_original.get("last_modified"))
+        meta = media_service.ler_meta(chave)
+
+    resp = media_service.responder_do_cache(chave, meta)
+    resp.headers["Vary"] = "Accept"
+    return resp
@@ -1,4 +1,5 @@
 from services.api_client import api
+from services.cache import cached, invalida
 
 def listar_partidas(rodada_id: int):
     return api("GET", f"/api/peladas/rodadas/{rodada_id}/partidas")
@@ -6,11 +7,15 @@ def listar_partidas(rodada_id: int):
 def criar_partida(rodada_id: int, time_casa_id: int, time_fora_id: int):
     return api("POST", f"/api/peladas/rodadas/{rodada_id}/partidas", json={"time_casa_id": time_casa_id, "time_fora_id": time_fora_id})
 
+@cached("obter_partida", ttl=10, tags=("partida:{partida_id}", "partida"))
 def obter_partida(partida_id: int):
     return api("GET", f"/api/peladas/partidas/{partida_id}")
 
+@invalida("partida:{partida_id}")
 def iniciar_partida(partida_id: int):
     return api("POST", f"/api/peladas/partidas/{partida_id}/iniciar")
 
+# partida finalizada altera a classificação da temporada
+@invalida("partida:{partida_id}", "ranking")
 def finalizar_partida(partida_id: int):
     return api("POST", f"/api/peladas/partidas/{partida_id}/finalizar")
@@ -1,4 +1,6 @@
 from services.api_client import api, api_upload
+from services.upload_imagem import preparar_upload
+from services.cache import cached, invalida
 
 def listar_peladas(page=1, per_page=10):
     return api("GET", "/api/peladas/", params={"page": page, "per_page": per_page})
@@ -13,9 +15,9 @@ def criar_pelada(nome: str, cidade: str, fuso_horario: str | None = None, logo_f
             data["fuso_horario"] = fuso_horario
         if logo_file:
             # Flask FileStorage precisa ser passado como tupla (nome, arquivo, content_type)
-            files["logo"] = (logo_file.filename, logo_file, logo_file.content_type or 'image/jpeg')
+            files["logo"] = preparar_upload(logo_file, 'image/jpeg')
         if perfil_file:
-            files["perfil"] = (perfil_file.filename, perfil_file, perfil_file.content_type or 'image/jpeg')
+            files["perfil"] = preparar_upload(perfil_file, 'image/jpeg')
         return api_upload("POST", "/api/peladas/", files=files, data=data)
     else:
         # Upload sem imagens (JSON)
@@ -24,9 +26,11 @@ def criar_pelada(nome: str, cidade: str, fuso_horario: str | None = None, logo_f
             payload["fuso_horario"] = fuso_horario
         return api("POST", "/api/peladas/", json=payload)
 
+@cached("perfil_pelada", ttl=120, tags=("pelada:{pelada_id}", "pelada"))
 def perfil_pelada(pelada_id: int):
     return api("GET", f"/api/peladas/{pelada_id}/perfil")
 
+@invalida("pelada:{pelada_id}")
 def atualizar_pelada(pelada_id: int, payload: dict, logo_file=None, perfil_file=None):
     """Atualiza pelada com suporte a upload de imagens"""
     if logo_file or perfil_file:
@@ -38,9 +42,9 @@ def atualizar_pelada(pelada_id: int, payload: dict, logo_file=None, perfil_file=
             data["ativa"] = str(data["ativa"]).lower()
         if logo_file:
             # Flask FileStorage precisa ser passado como tupla (nome, arquivo, content_type)
-            files["logo"] = (logo_file.filename, logo_file, logo_file.content_type or 'image/jpeg')
+            files["logo"] = preparar_upload(logo_file, 'image/jpeg')
         if perfil_file:
-            files["perfil"] = (perfil_file.filename, perfil_file, perfil_file.content_type or 'image/jpeg')
+            files["perfil"] = preparar_upload(perfil_file, 'image/jpeg')
         return api_upload("PUT", f"/api/peladas/{pelada_id}", files=files, data=data)
     else:
         # Atualização sem imagens (JSON)
@@ -0,0 +1,180 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from services import pelada_service as svc
+from services.api_client import token_atual
+
+# Índice em memória slug -> pelada para o perfil público (/perfil/<nome_pelada>).
+# O índice é montado por passadas completas em background (a primeira logo ao iniciar);
+# um slug que não está no índice custa no máximo uma página de listar_peladas, e nunca
+# mais de uma a cada PELADA_INDEX_PAGINA_INTERVALO, já que a rota é pública.
+#   PELADA_INDEX_REFRESH_SECONDS  -> intervalo do refresh completo em background
+#   PELADA_INDEX_MISS_TTL         -> por quanto tempo um slug inexistente não dispara nova busca
+#   PELADA_INDEX_MAX_MISSES       -> slugs inexistentes lembrados (LRU)
+#   PELADA_INDEX_PAGINA_INTERVALO -> segundos mínimos entre duas buscas de página por miss
+#   PELADA_INDEX_ESPERA_CARGA     -> quanto um request espera a primeira passada completa
+PELADA_INDEX_REFRESH_SECONDS = int(os.environ.get("PELADA_INDEX_REFRESH_SECONDS", "300"))
+PELADA_INDEX_MISS_TTL = int(os.environ.get("PELADA_INDEX_MISS_TTL", "30"))
+PELADA_INDEX_MAX_MISSES = int(os.environ.get("PELADA_INDEX_MAX_MISSES", "1000"))
+PELADA_INDEX_PAGINA_INTERVALO = float(os.environ.get("PELADA_INDEX_PAGINA_INTERVALO", "5"))
+PELADA_INDEX_ESPERA_CARGA = float(os.environ.get("PELADA_INDEX_ESPERA_CARGA", "10"))
+PER_PAGE = 50
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()  # uma passada completa por vez
+_pagina_lock = threading.Lock()   # uma busca de página por miss por vez
+_por_slug = {}      # slug -> pelada
+_slug_por_id = {}   # pelada_id -> slug
+_misses = OrderedDict()  # slug -> expira_em
+_ultima_pagina = {"em": float("-inf")}
+_carregado = threading.Event()  # primeira passada completa já rodou
+_background = None
+
+def criar_slug(texto):
+    """Converte texto para slug (URL-friendly)"""
+    # Remove acentos
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    # Converte para minúsculas
+    texto = texto.lower()
+    # Remove caracteres especiais, mantém apenas letras, números e espaços
+    texto = re.sub(r'[^a-z0-9\s-]', '', texto)
+    # Substitui espaços por hífens
+    texto = re.sub(r'\s+', '-', texto.strip())
+    # Remove hífens múltiplos
+    texto = re.sub(r'-+', '-', texto)
+    return texto
+
+def registrar(pelada: dict | None) -> bool:
+    """
+    Adiciona/atualiza uma pelada no índice (trata renomeação).
+    Aceita a pelada ou a resposta da API no formato {"pelada": {...}}.
+    """
+    if isinstance(pelada, dict) and isinstance(pelada.get("pelada"), dict):
+        pelada = pelada["pelada"]
+    if not isinstance(pelada, dict) or not pelada.get("id") or not pelada.get("nome"):
+        return False
+    pelada_id = pelada["id"]
+    slug = criar_slug(pelada["nome"])
+    with _lock:
+        antigo = _slug_por_id.get(pelada_id)
+        if antigo and antigo != slug and (_por_slug.get(antigo) or {}).get("id") == pelada_id:
+            del _por_slug[antigo]
+        # mantém a primeira pelada encontrada para um slug (mesmo critério da busca paginada)
+        atual = _por_slug.get(slug)
+        if atual is None or atual.get("id") == pelada_id:
+            _por_slug[slug] = dict(pelada)
+            _slug_por_id[pelada_id] = slug
+        _misses.pop(slug, None)
+    _iniciar_background()
+    return True
+
+def refresh() -> bool:
+    """
+    Passada completa por listar_peladas alimentando o índice; True se terminou sem erro.
+    Com token, remove do índice peladas que não existem mais; sem token (ex: refresh em
+    background) a listagem pode omitir peladas que existem, então nada é removido.
+    """
+    vistos = set()
+    page = 1
+    while True:
+        try:
+            data = svc.listar_peladas(page=page, per_page=PER_PAGE)
+        except Exception as e:
+            print(f"[WARN] Índice de peladas: erro na página {page}: {e}")
+            return False
+        for pelada in data.get("data", []):
+            registrar(pelada)
+            if pelada.get("id"):
+                vistos.add(pelada["id"])
+        meta = data.get("meta", {})
+        if page >= meta.get("total_pages", 1):
+            break
+        page += 1
+
+    if token_atual():
+        with _lock:
+            for pelada_id in [pid for pid in _slug_por_id if pid not in vistos]:
+                slug = _slug_por_id.pop(pelada_id)
+                if (_por_slug.get(slug) or {}).get("id") == pelada_id:
+                    del _por_slug[slug]
+    return True
+
+def _buscar_pagina():
+    """Busca direcionada de um miss: só a primeira página, no máximo uma a cada PELADA_INDEX_PAGINA_INTERVALO"""
+    with _pagina_lock:
+        if time.monotonic() - _ultima_pagina["em"] < PELADA_INDEX_PAGINA_INTERVALO:
+            return
+        _ultima_pagina["em"] = time.monotonic()
+        try:
+            data = svc.listar_peladas(page=1, per_page=PER_PAGE)
+        except Exception as e:
+            print(f"[WARN] Índice de peladas: erro na busca por miss: {e}")
+            return
+    for pelada in data.get("data", []):
+        registrar(pelada)
+
+def _no_indice(slug: str, agora: float):
+    """(pelada, é_miss_conhecido); chamar com _lock"""
+    pelada = _por_slug.get(slug)
+    if pelada is not None:
+        return dict(pelada), False
+    return None, _misses.get(slug, 0) > agora
+
+def buscar(slug: str) -> dict | None:
+    """Busca O(1) no índice; um miss custa no máximo uma página de listar_peladas"""
+    _iniciar_background()
+    with _lock:
+        pelada, miss = _no_indice(slug, time.monotonic())
+    if pelada is not None or miss:
+        return pelada
+
+    # antes da primeira passada completa um miss não diz nada: espera a carga
+    if not _carregado.is_set():
+        _carregado.wait(PELADA_INDEX_ESPERA_CARGA)
+        with _lock:
+            pelada, miss = _no_indice(slug, time.monotonic())
+        if pelada is not None or miss:
+            return pelada
+
+    _buscar_pagina()
+    with _lock:
+        pelada = _por_slug.get(slug)
+        if pelada is None:
+            _lembrar_miss(slug)
+            return None
+        return dict(pelada)
+
+def _lembrar_miss(slug: str):
+    """Registra um slug inexistente (chamar com _lock): varre os expirados e limita o tamanho"""
+    agora = time.monotonic()
+    _misses.pop(slug, None)
+    _misses[slug] = agora + PELADA_INDEX_MISS_TTL
+    # ordem de inserção = ordem de expiração (TTL fixo): os expirados estão no começo
+    while _misses:
+        primeiro, expira_em = next(iter(_misses.items()))
+        if expira_em > agora and len(_misses) <= PELADA_INDEX_MAX_MISSES:
+            break
+        del _misses[primeiro]
+
+def _loop_background():
+    while True:
+        try:
+            with _refresh_lock:
+                refresh()
+        except Exception as e:
+            print(f"[WARN] Índice de peladas: refresh em background falhou: {e}")
+        # mesmo com erro: requests não esperam mais a carga, misses passam a buscar página
+        _carregado.set()
+        time.sleep(PELADA_INDEX_REFRESH_SECONDS)
+
+def _iniciar_background():
+    global _background
+    if _background is not None:
+        return
+    with _lock:
+        if _background is None:
+            _background = threading.Thread(target=_loop_background, name="pelada-slug-index", daemon=True)
+            _background.start()
@@ -0,0 +1,179 @@
+import copy
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services import partida_service as svc
+from services.api_client import com_token
+
+# Snapshot da partida em memória para responder aos gols sem esperar um novo obter_partida.
+# O gol criado/removido é aplicado no snapshot e o placar é renderizado dele na hora;
+# em seguida um job busca a partida de verdade (reconciliação) e, se algo divergir,
+# o callback republica o placar correto (ex: via SSE, ver routes/partidas.py).
+# Cada aplicação otimista carimba o snapshot com uma versão nova; uma reconciliação que
+# começou antes dela é descartada (a da aplicação mais nova vem em seguida).
+#   RECONCILIAR_MAX_WORKERS -> threads só para a reconciliação (não disputa o pool de jobs
+#                              com a geração de imagens, que é lenta)
+SNAPSHOT_TTL = 600
+SNAPSHOT_MAX = 256
+RECONCILIAR_MAX_WORKERS = int(os.environ.get("RECONCILIAR_MAX_WORKERS", "2"))
+
+_lock = threading.Lock()
+_snapshots = {}  # partida_id -> (guardado_em, partida, versao)
+_versoes = itertools.count(1)
+_executor = None
+
+def _time_id(t: dict | None, fallback=None):
+    return (t or {}).get("id") or fallback
+
+def _lado(partida: dict, time_id, gol_contra: bool) -> str | None:
+    """'casa' ou 'fora' para o placar: gol contra conta para o adversário do time informado"""
+    casa = _time_id(partida.get("time_casa"), partida.get("time_casa_id"))
+    fora = _time_id(partida.get("time_fora"), partida.get("time_fora_id"))
+    if time_id is None or time_id not in (casa, fora):
+        return None
+    marcou_casa = (time_id == casa) != bool(gol_contra)
+    return "casa" if marcou_casa else "fora"
+
+def _jogadores_conhecidos(partida: dict) -> dict:
+    jogadores = {}
+    for chave in ("time_casa_full", "time_fora_full"):
+        for j in (partida.get(chave) or {}).get("jogadores") or []:
+            if j.get("id"):
+                jogadores[j["id"]] = j
+    for g in partida.get("gols") or []:
+        for chave in ("jogador", "assistente"):
+            j = g.get(chave)
+            if isinstance(j, dict) and j.get("id"):
+                jogadores.setdefault(j["id"], j)
+    return jogadores
+
+def _guardar(partida: dict):
+    # chamado com _lock; mantém a versão e os elencos *_full do snapshot anterior
+    anterior = _snapshots.get(partida["id"])
+    novo = copy.deepcopy(partida)
+    if anterior:
+        for chave in ("time_casa_full", "time_fora_full"):
+            if chave not in novo and chave in anterior[1]:
+                novo[chave] = anterior[1][chave]
+    _snapshots[partida["id"]] = (time.monotonic(), novo, anterior[2] if anterior else 0)
+    if len(_snapshots) > SNAPSHOT_MAX:
+        mais_antigo = min(_snapshots, key=lambda k: _snapshots[k][0])
+        del _snapshots[mais_antigo]
+
+def lembrar(partida: dict | None):
+    """Guarda a partida (formato de obter_partida()["partida"]) como snapshot; mantém os elencos *_full"""
+    if not isinstance(partida, dict) or not partida.get("id"):
+        return
+    with _lock:
+        _guardar(partida)
+
+def _versao(partida_id: int) -> int:
+    # chamado com _lock
+    item = _snapshots.get(partida_id)
+    return item[2] if item else 0
+
+def _snapshot(partida_id: int) -> dict | None:
+    # chamado com _lock
+    item = _snapshots.get(partida_id)
+    if not item or time.monotonic() - item[0] > SNAPSHOT_TTL:
+        return None
+    return item[1]
+
+def aplicar_gol_criado(partida_id: int, payload: dict, resposta) -> dict | None:
+    """Partida com o gol novo aplicado ao snapshot, ou None se não há snapshot confiável"""
+    with _lock:
+        partida = _snapshot(partida_id)
+        if partida is None:
+            return None
+        lado = _lado(partida, payload.get("time_id"), payload.get("gol_contra"))
+        if lado is None:
+            return None
+        gol = (resposta or {}).get("gol") if isinstance(resposta, dict) else None
+        gol = dict(gol) if isinstance(gol, dict) else {}
+        if not gol.get("id"):
+            gol["id"] = resposta.get("id") if isinstance(resposta, dict) else None
+        if not gol["id"]:
+            # sem id não dá para montar o botão de remover: quem chamou busca a partida
+            return None
+        jogadores = _jogadores_conhecidos(partida)
+        gol.setdefault("minuto", payload.get("minuto"))
+        gol.setdefault("gol_contra", bool(payload.get("gol_contra")))
+        gol.setdefault("time_id", payload.get("time_id"))
+        if not isinstance(gol.get("jogador"), dict):
+            gol["jogador"] = jogadores.get(payload.get("jogador_id")) or {"id": payload.get("jogador_id")}
+        if payload.get("assistencia_id") and not isinstance(gol.get("assistente"), dict):
+            gol["assistente"] = jogadores.get(payload["assistencia_id"])
+        partida["gols"] = list(partida.get("gols") or []) + [gol]
+        partida[f"gols_{lado}"] = (partida.get(f"gols_{lado}") or 0) + 1
+        _snapshots[partida_id] = (_snapshots[partida_id][0], partida, next(_versoes))
+        return copy.deepcopy(partida)
+
+def aplicar_gol_removido(partida_id: int, gol_id: int) -> dict | None:
+    """Partida sem o gol removido, ou None se o snapshot não tem como saber o lado do gol"""
+    with _lock:
+        partida = _snapshot(partida_id)
+        if partida is None:
+            return None
+        gols = list(partida.get("gols") or [])
+        gol = next((g for g in gols if g.get("id") == gol_id), None)
+        if gol is None:
+            return None
+        lado = _lado(partida, gol.get("time_id") or _time_id(gol.get("time")), gol.get("gol_contra"))
+        if lado is None:
+            return None
+        partida["gols"] = [g for g in gols if g is not gol]
+        partida[f"gols_{lado}"] = max(0, (partida.get(f"gols_{lado}") or 0) - 1)
+        _snapshots[partida_id] = (_snapshots[partida_id][0], partida, next(_versoes))
+        return copy.deepcopy(partida)
+
+def _resumo(partida: dict) -> tuple:
+    return (
+        partida.get("gols_casa") or 0,
+        partida.get("gols_fora") or 0,
+        tuple(sorted(str(g.get("id")) for g in partida.get("gols") or [])),
+    )
+
+def reconciliar(partida_id: int, token: str | None, ao_divergir=None):
+    """
+    Busca a partida real (roda em job) e substitui o snapshot. Se o que foi mostrado
+    de forma otimista divergir, chama ao_divergir(partida) para republicar o placar.
+    Se outro gol foi aplicado no snapshot durante a busca, o resultado é descartado.
+    """
+    with _lock:
+        otimista = copy.deepcopy(_snapshot(partida_id))
+        versao = _versao(partida_id)
+    with com_token(token):
+        partida = svc.obter_partida(partida_id).get("partida")
+    if not isinstance(partida, dict) or not partida.get("id"):
+        return
+    with _lock:
+        if _versao(partida_id) != versao:
+            print(f"[DEBUG] Reconciliação da partida {partida_id} descartada: snapshot mais novo")
+            return
+        _guardar(partida)
+    if otimista is not None and isinstance(partida, dict) and _resumo(partida) != _resumo(otimista):
+        print(f"[DEBUG] Placar otimista da partida {partida_id} divergiu; republicando")
+        if ao_divergir:
+            with _lock:
+                atual = copy.deepcopy(_snapshot(partida_id))
+            ao_divergir(atual)
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=RECONCILIAR_MAX_WORKERS, thread_name_prefix="reconciliar")
+    return _executor
+
+def _reconciliar_seguro(partida_id: int, token: str | None, ao_divergir):
+    try:
+        reconciliar(partida_id, token, ao_divergir)
+    except Exception as e:
+        print(f"[WARN] Reconciliação da partida {partida_id} falhou: {e}")
+
+def reconciliar_em_background(partida_id: int, token: str | None, ao_divergir=None):
+    """Agenda reconciliar() no pool próprio e volta na hora"""
+    _get_executor().submit(_reconciliar_seguro, partida_id, token, ao_divergir)
@@ -1,10 +1,14 @@
 from services.api_client import api
+from services.cache import cached
 
+@cached("ranking_times", ttl=60, tags=("ranking:{temporada_id}", "ranking"))
 def ranking_times(temporada_id: int):
     return api("GET", f"/api/peladas/temporadas/{temporada_id}/ranking/times")
 
+@cached("ranking_artilheiros", ttl=60, tags=("ranking:{temporada_id}", "ranking"))
 def ranking_artilheiros(temporada_id: int, limit=10):
     return api("GET", f"/api/peladas/temporadas/{temporada_id}/ranking/artilheiros", params={"limit": limit})
 
+@cached("ranking_assistencias", ttl=60, tags=("ranking:{temporada_id}", "ranking"))
 def ranking_assistencias(temporada_id: int, limit=10):
     return api("GET", f"/api/peladas/temporadas/{temporada_id}/ranking/assistencias", params={"limit": limit})
@@ -1,8 +1,11 @@
 from services.api_client import api
+from services.cache import invalida, por_request
 
 def listar_rodadas(temporada_id: int, page=1, per_page=10):
     return api("GET", f"/api/peladas/temporadas/{temporada_id}/rodadas", params={"page": page, "per_page": per_page})
 
+# a API pode criar times junto com a rodada (quantidade_times sem time_ids)
+@invalida("times:{temporada_id}")
 def criar_rodada(temporada_id: int, data_rodada: str, quantidade_times: int, jogadores_por_time: int, time_ids: list = None):
     payload = {
         "data_rodada": data_rodada,
@@ -13,9 +16,11 @@ def criar_rodada(temporada_id: int, data_rodada: str, quantidade_times: int, jog
         payload["time_ids"] = time_ids
     return api("POST", f"/api/peladas/temporadas/{temporada_id}/rodadas", json=payload)
 
+@por_request("obter_rodada")
 def obter_rodada(rodada_id: int):
     return api("GET", f"/api/peladas/rodadas/{rodada_id}")
 
+@por_request("listar_jogadores_rodada")
 def listar_jogadores_rodada(rodada_id: int, posicao: int = None, apenas_ativos: bool = True):
     params = {}
     if posicao is not None:
@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from services import temporada_service as temp_svc
+from services import ranking_service as rank_svc
+from services import time_service as time_svc
+from services import estatisticas
+from services.fanout import em_paralelo
+
+# Agregados de temporadas encerradas não mudam: ficam memorizados no processo (LRU com TTL,
+# para correções feitas direto no backend aparecerem um dia). Só status explicitamente
+# encerrado conta; ativa, planejada ou desconhecida é sempre recalculada (os rankings
+# dela já passam pelo cache de services/cache.py).
+#   SCOUT_ENCERRADAS_TTL -> segundos até recalcular o agregado de uma temporada encerrada
+# Os agregados ficam normalizados ({jogador_id: total}, ver services/estatisticas.py): o payload é lido uma vez só.
+MAX_TEMPORADAS_MEMORIZADAS = 2048
+SCOUT_ENCERRADAS_TTL = int(os.environ.get("SCOUT_ENCERRADAS_TTL", "86400"))
+STATUS_ENCERRADA = ("encerrada", "finalizada")
+TOP_N = 10  # scout_anual.html mostra os 10 primeiros de cada ranking
+
+_lock = threading.Lock()
+_encerradas = OrderedDict()  # temporada_id -> (expira_em, agregado)
+
+def _pagina_temporadas(pelada_id: int, page: int) -> dict:
+    try:
+        return temp_svc.listar_temporadas(pelada_id, page=page, per_page=100)
+    except Exception as e:
+        print(f"[WARN] Erro ao buscar temporadas (página {page}): {e}")
+        return {}
+
+def listar_todas_temporadas(pelada_id: int) -> list:
+    """Busca todas as temporadas da pelada: 1ª página primeiro, demais páginas em paralelo"""
+    data = _pagina_temporadas(pelada_id, 1)
+    temporadas = list(data.get("data", []))
+    total_pages = (data.get("meta") or {}).get("total_pages", 1) or 1
+    if total_pages > 1:
+        paginas = em_paralelo({
+            page: (lambda p=page: _pagina_temporadas(pelada_id, p))
+            for page in range(2, total_pages + 1)
+        })
+        for page in range(2, total_pages + 1):
+            temporadas.extend(paginas[page].get("data", []))
+    return temporadas
+
+def _temporada_encerrada(temporada: dict) -> bool:
+    return str(temporada.get("status") or "").lower() in STATUS_ENCERRADA
+
+def agregar_temporada(temporada_id: int) -> dict:
+    """
+    Agregado de uma temporada:
+        {"gols": coluna, "assistencias": coluna (ver estatisticas.coluna),
+         "campeoes": [jogador_id, ...],
+         "completo": bool}
+    """
+    resultados = em_paralelo({
+        "artilheiros": lambda: rank_svc.ranking_artilheiros(temporada_id, limit=1000),
+        "assistencias": lambda: rank_svc.ranking_assistencias(temporada_id, limit=1000),
+        "times": lambda: rank_svc.ranking_times(temporada_id),
+    })
+
+    gols = estatisticas.coluna(resultados["artilheiros"], "gols")
+    assistencias = estatisticas.coluna(resultados["assistencias"], "assistencias")
+
+    # Time campeão (primeiro lugar)
+    campeoes = []
+    completo = True
+    ranking_times = estatisticas.lista_ranking(resultados["times"])
+    if ranking_times:
+        primeiro_lugar = ranking_times[0]
+        time_campeao = primeiro_lugar.get("time", {}) if isinstance(primeiro_lugar, dict) else primeiro_lugar
+        if time_campeao and time_campeao.get("id"):
+            try:
+                time_data = time_svc.obter_time(time_campeao["id"])
+                if isinstance(time_data, dict):
+                    time_full = time_data.get("time", time_data)
+                    jogadores_time = time_full.get("jogadores", []) if isinstance(time_full, dict) else []
+                    campeoes = [j.get("id") for j in jogadores_time if j.get("id")]
+            except Exception as e:
+                completo = False
+                print(f"[WARN] Erro ao buscar jogadores do time campeão (temp {temporada_id}): {e}")
+
+    return {"gols": gols, "assistencias": assistencias, "campeoes": campeoes, "completo": completo}
+
+def _agregado(temporada: dict):
+    temporada_id = temporada.get("id")
+    encerrada = _temporada_encerrada(temporada)
+    if encerrada:
+        with _lock:
+            item = _encerradas.get(temporada_id)
+            if item and item[0] > time.monotonic():
+                _encerradas.move_to_end(temporada_id)
+                return item[1]
+    try:
+        agregado = agregar_temporada(temporada_id)
+    except Exception as e:
+        print(f"[WARN] Erro ao processar temporada {temporada_id}: {e}")
+        return None
+    if encerrada and agregado["completo"]:
+        with _lock:
+            _encerradas[temporada_id] = (time.monotonic() + SCOUT_ENCERRADAS_TTL, agregado)
+            _encerradas.move_to_end(temporada_id)
+            while len(_encerradas) > MAX_TEMPORADAS_MEMORIZADAS:
+                _encerradas.popitem(last=False)
+    return agregado
+
+def scout_anual(temporadas: list) -> dict:
+    """
+    Consolida todas as temporadas (buscadas em paralelo) em rankings de gols,
+    assistências e títulos, no formato esperado por peladas/scout_anual.html.
+    """
+    validas = [t for t in temporadas if isinstance(t, dict) and t.get("id")]
+    agregados = em_paralelo({
+        t["id"]: (lambda t=t: _agregado(t))
+        for t in validas
+    }, max_concorrencia=6)
+
+    agregados = [agregados[t["id"]] for t in validas if agregados.get(t["id"])]
+    gols = estatisticas.somar([a["gols"] for a in agregados])
+    assistencias = estatisticas.somar([a["assistencias"] for a in agregados])
+    titulos = estatisticas.titulos(a["campeoes"] for a in agregados)
+
+    ranking_gols = [
+        {"jogador": gols["jogadores"][jogador_id], "total_gols": qtd}
+        for jogador_id, qtd in estatisticas.top(gols, TOP_N)
+    ]
+    ranking_assistencias = [
+        {"jogador": assistencias["jogadores"][jogador_id], "total_assistencias": qtd}
+        for jogador_id, qtd in estatisticas.top(assistencias, TOP_N)
+    ]
+
+    # Ranking de títulos - agrupado por quantidade
+    ranking_titulos_por_qtd = {}
+    for jogador_id, qtd_titulos in estatisticas.top(titulos):
+        jogador_data = gols["jogadores"].get(jogador_id) or assistencias["jogadores"].get(jogador_id)
+        if jogador_data:
+            ranking_titulos_por_qtd.setdefault(qtd_titulos, []).append({
+                "jogador": jogador_data,
+                "total_titulos": qtd_titulos
+            })
+
+    ranking_titulos = [
+        {"total_titulos": qtd, "jogadores": ranking_titulos_por_qtd[qtd]}
+        for qtd in sorted(ranking_titulos_por_qtd.keys(), reverse=True)
+    ]
+
+    return {
+        "ranking_gols": ranking_gols,
+        "ranking_assistencias": ranking_assistencias,
+        "ranking_titulos": ranking_titulos,
+    }
@@ -1,13 +1,17 @@
 from services.api_client import api
+from services.cache import cached, invalida
 
 def listar_temporadas(pelada_id: int, page=1, per_page=10):
     return api("GET", f"/api/peladas/{pelada_id}/temporadas", params={"page": page, "per_page": per_page})
 
+@invalida("pelada:{pelada_id}")
 def criar_temporada(pelada_id: int, inicio_mes: str, fim_mes: str):
     return api("POST", f"/api/peladas/{pelada_id}/temporadas", json={"inicio_mes": inicio_mes, "fim_mes": fim_mes})
 
+@cached("obter_temporada", ttl=300, tags=("temporada:{temporada_id}",))
 def obter_temporada(temporada_id: int):
     return api("GET", f"/api/peladas/temporadas/{temporada_id}")
 
+@invalida("temporada:{temporada_id}", "ranking:{temporada_id}", "pelada")
 def encerrar_temporada(temporada_id: int):
     return api("POST", f"/api/peladas/temporadas/{temporada_id}/encerrar")
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from services import time_service as time_svc
+from services.cache import ao_invalidar
+
+# Índice em memória jogador_id -> time_id por temporada, usado no seletor de jogadores
+# disponíveis de times.detalhe. Construído uma vez a partir da lista de times da temporada
+# e mantido em dia pelas ações de adicionar/remover jogador (atribuir/liberar), sem listar
+# todos os times de novo a cada visualização. Mudanças na lista de times (criar_time,
+# criar_rodada) e escritas em times que o índice não conhece chegam pelo hook do cache.
+#   TIME_INDEX_TTL -> segundos até reconstruir o índice de uma temporada (escritas de outros processos)
+#   TIME_INDEX_MAX -> temporadas mantidas em memória (LRU)
+TIME_INDEX_TTL = int(os.environ.get("TIME_INDEX_TTL", "300"))
+TIME_INDEX_MAX = int(os.environ.get("TIME_INDEX_MAX", "64"))
+
+_lock = threading.Lock()
+_indices = OrderedDict()  # temporada_id -> (expira_em, {jogador_id: time_id}, {time_id, ...})
+_locks_temporada = {}     # temporada_id -> Lock (uma construção por temporada por vez)
+_geracao = 0              # incrementa a cada escrita (descarta índice lido antes dela)
+
+def ids_jogadores(t: dict) -> list:
+    """IDs dos jogadores de um time: lista de dicts, lista de IDs ou campo time_jogadores"""
+    ids = []
+    for j in t.get("jogadores") or t.get("time_jogadores") or []:
+        jogador_id = None
+        if isinstance(j, dict):
+            jogador_id = j.get("id") or j.get("jogador_id") or (j.get("jogador", {}).get("id") if isinstance(j.get("jogador"), dict) else None)
+        elif isinstance(j, (int, str)):
+            jogador_id = j
+        try:
+            if jogador_id:
+                ids.append(int(jogador_id))
+        except (ValueError, TypeError):
+            pass
+    return ids
+
+def _construir(temporada_id: int) -> tuple:
+    atribuicoes = {}
+    time_ids = set()
+    times = time_svc.listar_times_pelada(temporada_id, per_page=200).get("data", [])
+    for t in times:
+        if not t.get("id"):
+            continue
+        time_ids.add(t["id"])
+        for jogador_id in ids_jogadores(t):
+            atribuicoes[jogador_id] = t["id"]
+    return atribuicoes, time_ids
+
+def _indice(temporada_id: int) -> dict:
+    # chamado com _lock
+    item = _indices.get(temporada_id)
+    if item and item[0] > time.monotonic():
+        _indices.move_to_end(temporada_id)
+        return item[1]
+    return None
+
+def jogadores_em_times(temporada_id: int) -> frozenset:
+    """IDs dos jogadores que já estão em algum time da temporada"""
+    with _lock:
+        atribuicoes = _indice(temporada_id)
+        if atribuicoes is not None:
+            return frozenset(atribuicoes)
+        lock_temporada = _locks_temporada.setdefault(temporada_id, threading.Lock())
+
+    with lock_temporada:
+        with _lock:
+            atribuicoes = _indice(temporada_id)
+            if atribuicoes is not None:
+                return frozenset(atribuicoes)
+            geracao = _geracao
+        atribuicoes, time_ids = _construir(temporada_id)
+        with _lock:
+            # uma escrita durante a construção pode ter vindo de uma lista antiga: não guarda
+            if geracao == _geracao:
+                _indices[temporada_id] = (time.monotonic() + TIME_INDEX_TTL, atribuicoes, time_ids)
+                _indices.move_to_end(temporada_id)
+                while len(_indices) > TIME_INDEX_MAX:
+                    antigo, _ = _indices.popitem(last=False)
+                    _locks_temporada.pop(antigo, None)
+        return frozenset(atribuicoes)
+
+def _item_do_time(time_id: int):
+    # chamado com _lock; time que nenhum índice conhece (criado depois da construção):
+    # não se sabe a temporada, então descarta todos (reconstruídos na próxima leitura)
+    for item in _indices.values():
+        if time_id in item[2]:
+            return item
+    _indices.clear()
+    return None
+
+def atribuir(time_id: int, jogador_id: int):
+    """Jogador entrou no time (chamar depois que a API confirmou)"""
+    global _geracao
+    with _lock:
+        _geracao += 1
+        item = _item_do_time(time_id)
+        if item:
+            item[1][int(jogador_id)] = time_id
+
+def liberar(time_id: int, jogador_id: int):
+    """Jogador saiu do time (chamar depois que a API confirmou)"""
+    global _geracao
+    with _lock:
+        _geracao += 1
+        item = _item_do_time(time_id)
+        if item and item[1].get(int(jogador_id)) == time_id:
+            del item[1][int(jogador_id)]
+
+def invalidar(temporada_id: int | None = None):
+    global _geracao
+    with _lock:
+        _geracao += 1
+        if temporada_id is None:
+            _indices.clear()
+        else:
+            _indices.pop(temporada_id, None)
+
+@ao_invalidar
+def _ao_invalidar_cache(tags: set):
+    global _geracao
+    # lista de times da temporada mudou (criar_time, criar_rodada)
+    temporadas = {t.split(":", 1)[1] for t in tags if t.startswith("times:")}
+    for temporada_id in temporadas:
+        try:
+            invalidar(int(temporada_id))
+        except ValueError:
+            invalidar()
+    # elenco de um time: os conhecidos seguem por atribuir/liberar; desconhecido descarta tudo
+    time_ids = [t.split(":", 1)[1] for t in tags if t.startswith("time:")]
+    with _lock:
+        if time_ids:
+            _geracao += 1  # construção em andamento pode ter lido o elenco antigo
+        for time_id in time_ids:
+            try:
+                _item_do_time(int(time_id))
+            except ValueError:
+                _indices.clear()
+    # "times" sozinho (sem time/temporada específicos): não dá para saber o alcance
+    if "times" in tags and not time_ids and not temporadas:
+        invalidar()
@@ -1,5 +1,12 @@
-from services.api_client import api, api_upload
+import os
+from services.api_client import api, api_upload, ApiError
+from services.upload_imagem import preparar_upload
+from services.cache import cached, invalida
 
+# TIME_MEMBRO_PUT -> "1" se o backend tiver PUT /times/{id}/jogadores/{jogador_id} (não documentado no PRD)
+TIME_MEMBRO_PUT = os.environ.get("TIME_MEMBRO_PUT", "0") == "1"
+
+@cached("listar_times_pelada", ttl=120, tags=("times:{temporada_id}", "times"))
 def listar_times_pelada(temporada_id: int, page: int = None, per_page: int = None):
     params = {}
     if page is not None:
@@ -8,10 +15,11 @@ def listar_times_pelada(temporada_id: int, page: int = None, per_page: int = Non
         params["per_page"] = per_page
     return api("GET", f"/api/peladas/temporadas/{temporada_id}/times", params=params if params else None)
 
+@invalida("times:{temporada_id}")
 def criar_time(temporada_id: int, nome: str, cor: str = None, escudo_file=None):
     if escudo_file and escudo_file.filename:
         # Upload com arquivo
-        files = {"escudo": (escudo_file.filename, escudo_file, escudo_file.content_type)}
+        files = {"escudo": preparar_upload(escudo_file, manter_png=True)}
         data = {"nome": nome}
         if cor:
             data["cor"] = cor
@@ -23,20 +31,65 @@ def criar_time(temporada_id: int, nome: str, cor: str = None, escudo_file=None):
             payload["cor"] = cor
         return api("POST", f"/api/peladas/temporadas/{temporada_id}/times", json=payload)
 
+# elenco do time: invalidado por adicionar/remover jogador e escudo (tags "time:{time_id}"/"times")
+@cached("obter_time", ttl=300, tags=("time:{time_id}", "times"))
 def obter_time(time_id: int):
     return api("GET", f"/api/peladas/times/{time_id}")
 
+@invalida("time:{time_id}", "times")
 def adicionar_jogador(time_id: int, jogador_id: int, capitao: bool, posicao: str | int | None):
     payload = {"jogador_id": jogador_id, "capitao": bool(capitao), "posicao": posicao}
     return api("POST", f"/api/peladas/times/{time_id}/jogadores", json=payload)
 
+@invalida("time:{time_id}", "times")
 def remover_jogador(time_id: int, jogador_id: int):
     return api("DELETE", f"/api/peladas/times/{time_id}/jogadores/{jogador_id}")
 
+def _membro(time_id: int, jogador_id: int) -> dict | None:
+    """{"capitao", "posicao"} do jogador no time (elenco via cache) ou None"""
+    time = obter_time(time_id).get("time") or {}
+    for j in time.get("jogadores") or []:
+        if isinstance(j, dict) and j.get("id") == jogador_id:
+            return {"capitao": bool(j.get("capitao")), "posicao": j.get("posicao") or None}
+    return None
+
+@invalida("time:{time_id}", "times")
+def atualizar_jogador_time(time_id: int, jogador_id: int, posicao: str | int | None, capitao: bool | None = None):
+    """
+    Atualiza posição (e capitão) do jogador no time. A API documenta só DELETE + POST do membro:
+    remove e adiciona de novo; se a nova entrada falhar, recoloca o jogador como estava.
+    Com TIME_MEMBRO_PUT=1 (backend com PUT do membro) vai numa chamada só.
+    """
+    payload = {"posicao": posicao}
+    if capitao is not None:
+        payload["capitao"] = bool(capitao)
+    if TIME_MEMBRO_PUT:
+        return api("PUT", f"/api/peladas/times/{time_id}/jogadores/{jogador_id}", json=payload)
+
+    anterior = _membro(time_id, jogador_id)
+    if capitao is None:
+        capitao = anterior["capitao"] if anterior else False
+    remover_jogador(time_id, jogador_id)
+    try:
+        return adicionar_jogador(time_id, jogador_id, bool(capitao), posicao)
+    except ApiError as e:
+        if anterior is None:
+            raise
+        try:
+            adicionar_jogador(time_id, jogador_id, anterior["capitao"], anterior["posicao"])
+        except ApiError as e_volta:
+            print(f"[WARN] Jogador {jogador_id} ficou fora do time {time_id}: {e_volta.payload}")
+            raise ApiError(e.status_code, {
+                "erro": f"{e.payload.get('erro', 'Erro ao atualizar o jogador')} "
+                        f"(o jogador foi removido do time e não pôde ser recolocado)"
+            })
+        raise
+
+@invalida("time:{time_id}", "times", "ranking")
 def atualizar_escudo(time_id: int, escudo_file):
     """Atualiza o escudo do time"""
     if escudo_file and escudo_file.filename:
-        files = {"escudo": (escudo_file.filename, escudo_file, escudo_file.content_type)}
+        files = {"escudo": preparar_upload(escudo_file, manter_png=True)}
         return api_upload("PUT", f"/api/peladas/times/{time_id}", files=files, data={})
     else:
         raise ValueError("Arquivo de escudo é obrigatório")
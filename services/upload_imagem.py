@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+from PIL import Image, ImageOps
+
+# Pré-processamento das imagens enviadas (foto do jogador, logo/perfil da pelada, escudo do time)
+# antes de repassar ao backend: corrige a orientação (EXIF), limita as dimensões e recomprime.
+#   UPLOAD_MAX_LADO       -> maior lado permitido em px
+#   UPLOAD_JPEG_QUALIDADE -> qualidade do JPEG recomprimido
+#   UPLOAD_SPOOL_BYTES    -> até esse tamanho o arquivo recomprimido fica em memória, acima vai p/ disco
+UPLOAD_MAX_LADO = int(os.environ.get("UPLOAD_MAX_LADO", "1600"))
+UPLOAD_JPEG_QUALIDADE = int(os.environ.get("UPLOAD_JPEG_QUALIDADE", "85"))
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", str(2 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_stats = {"arquivos": 0, "recomprimidos": 0, "bytes_originais": 0, "bytes_enviados": 0}
+
+def _tamanho(stream) -> int | None:
+    try:
+        pos = stream.tell()
+        stream.seek(0, os.SEEK_END)
+        tamanho = stream.tell()
+        stream.seek(pos)
+        return tamanho
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _contabilizar(original: int, enviado: int, recomprimido: bool):
+    with _lock:
+        _stats["arquivos"] += 1
+        _stats["recomprimidos"] += 1 if recomprimido else 0
+        _stats["bytes_originais"] += original
+        _stats["bytes_enviados"] += enviado
+
+def _trocar_extensao(filename: str, ext: str) -> str:
+    base, _ = os.path.splitext(filename or "imagem")
+    return base + ext
+
+def preparar_upload(arquivo, content_type_padrao: str | None = None, manter_png: bool = False):
+    """
+    Recebe um FileStorage e devolve a tupla (nome, arquivo, content_type) para `files=` do api_upload.
+
+    A imagem é decodificada direto do stream do upload (sem .read() para bytes) e recomprimida
+    num arquivo temporário "spooled". Se não for uma imagem que o Pillow entenda, for animada,
+    ou se a versão recomprimida não ficar menor (e não precisou girar/reduzir), envia o original.
+    PNG sem transparência vira JPEG, exceto com `manter_png` (escudos: cores chapadas e bordas nítidas).
+    """
+    stream = arquivo.stream
+    original = _tamanho(stream) or 0
+    content_type = arquivo.content_type or content_type_padrao
+    original_tupla = (arquivo.filename, stream, content_type)
+
+    try:
+        stream.seek(0)
+        with Image.open(stream) as img:
+            if getattr(img, "is_animated", False):
+                raise ValueError("imagem animada")
+            formato_origem = img.format
+            tamanho_origem = img.size
+            # JPEG: decodifica já reduzido (escala 1/2, 1/4, 1/8) quando a foto é muito maior que o limite
+            img.draft("RGB", (UPLOAD_MAX_LADO, UPLOAD_MAX_LADO))
+            reduzida_no_draft = img.size != tamanho_origem
+            orientacao = img.getexif().get(0x0112, 1)
+            img = ImageOps.exif_transpose(img)
+            reduzir = max(img.size) > UPLOAD_MAX_LADO
+            if reduzir:
+                img.thumbnail((UPLOAD_MAX_LADO, UPLOAD_MAX_LADO), Image.LANCZOS, reducing_gap=3.0)
+
+            tem_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            saida = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+            if tem_alpha or (manter_png and formato_origem == "PNG"):
+                # logos com transparência e escudos PNG continuam PNG
+                img.save(saida, format="PNG", optimize=True)
+                formato, ext = "image/png", ".png"
+            else:
+                img.convert("RGB").save(saida, format="JPEG", quality=UPLOAD_JPEG_QUALIDADE,
+                                        optimize=True, progressive=True)
+                formato, ext = "image/jpeg", ".jpg"
+    except Exception as e:
+        print(f"[UPLOAD] {arquivo.filename}: enviado sem alteração ({e})")
+        stream.seek(0)
+        _contabilizar(original, original, False)
+        return original_tupla
+
+    enviado = saida.tell()
+    # reduzida no draft também conta: o original tem o tamanho cheio
+    precisou = reduzir or reduzida_no_draft or orientacao != 1
+    if original and enviado >= original and not precisou:
+        saida.close()
+        stream.seek(0)
+        _contabilizar(original, original, False)
+        print(f"[UPLOAD] {arquivo.filename} ({formato_origem}): {original} bytes, mantido o original")
+        return original_tupla
+
+    saida.seek(0)
+    _contabilizar(original, enviado, True)
+    economia = original - enviado
+    print(f"[UPLOAD] {arquivo.filename} ({formato_origem}): {original} -> {enviado} bytes "
+          f"(economia {economia} bytes{f', {economia * 100 // original}%' if original else ''})")
+    return (_trocar_extensao(arquivo.filename, ext), saida, formato)
+
+def upload_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+    stats["bytes_economizados"] = stats["bytes_originais"] - stats["bytes_enviados"]
+    return stats
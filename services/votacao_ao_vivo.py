@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from services import ao_vivo
+from services import votacao_service as svc
+from services.api_client import com_token, token_atual
+from services.cache import escopo_atual
+
+# Resultado ao vivo da votação: um único poller por votação e por escopo (usuário logado ou
+# anônimo, ver cache.escopo_atual) busca o resultado na API e publica no canal
+# "votacao:<id>:<escopo>" só quando muda. O resultado enriquecido com o token de um usuário
+# nunca chega a quem assiste com outro token, e a carga no backend depende de quantos
+# usuários distintos assistem, não de quantas conexões.
+#   RESULTADO_POLL_SECONDS -> intervalo entre buscas do resultado
+#   RESULTADO_OCIOSO_SECONDS -> sem assinantes por esse tempo, o poller para
+RESULTADO_POLL_SECONDS = float(os.environ.get("RESULTADO_POLL_SECONDS", "3"))
+RESULTADO_OCIOSO_SECONDS = float(os.environ.get("RESULTADO_OCIOSO_SECONDS", "10"))
+STATUS_ENCERRADA = ("encerrada", "fechada", "closed", "finalizada")
+
+_lock = threading.Lock()
+_pollers = {}  # (votacao_id, escopo) -> {"token", "renderizar", "ultimo", "thread"}
+
+def canal(votacao_id: int, escopo: str) -> str:
+    return f"votacao:{votacao_id}:{escopo}"
+
+def _encerrada(data: dict) -> bool:
+    votacao = data.get("votacao") or {}
+    return str(votacao.get("status") or "").lower() in STATUS_ENCERRADA
+
+def _loop(chave: tuple):
+    votacao_id, escopo = chave
+    nome = canal(votacao_id, escopo)
+    ultimo_hash = None
+    ocioso_desde = None
+    while True:
+        with _lock:
+            if ao_vivo.assinantes(nome) == 0:
+                # sem ninguém: o canal perde o último estado, então republica quando alguém voltar
+                ultimo_hash = None
+                ocioso_desde = ocioso_desde or time.monotonic()
+                if time.monotonic() - ocioso_desde > RESULTADO_OCIOSO_SECONDS:
+                    _pollers.pop(chave, None)
+                    break
+            else:
+                ocioso_desde = None
+            poller = _pollers[chave]
+            token, renderizar = poller["token"], poller["renderizar"]
+        if ocioso_desde is None:
+            try:
+                # renderizar também busca dados (jogadores da rodada): roda com o mesmo token
+                with com_token(token):
+                    data = svc.obter_resultado(votacao_id)
+                    h = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+                    if h != ultimo_hash:
+                        ultimo_hash = h
+                        payload = renderizar(data)
+                        with _lock:
+                            poller["ultimo"]["resultado"] = payload
+                        ao_vivo.publicar(nome, "resultado", payload)
+                if _encerrada(data):
+                    with _lock:
+                        poller["ultimo"]["encerrada"] = "1"
+                    ao_vivo.publicar(nome, "encerrada", "1")
+                    with _lock:
+                        _pollers.pop(chave, None)
+                    break
+            except Exception as e:
+                print(f"[WARN] Resultado ao vivo da votação {votacao_id}: {e}")
+        time.sleep(RESULTADO_POLL_SECONDS)
+    print(f"[DEBUG] Poller da votação {votacao_id} encerrado")
+
+def assinar(votacao_id: int, renderizar) -> tuple:
+    """
+    Assina o resultado ao vivo com o token do request atual e garante o poller do escopo
+    rodando; devolve (canal, fila) para ao_vivo.stream. `renderizar(data) -> str` monta o
+    payload publicado (chamado só quando o resultado muda, dentro de com_token).
+    Quem entra recebe o último payload do poller na hora, mesmo que o canal tenha sido
+    recriado (reconexão antes do poller perceber que ficou sem assinantes).
+    """
+    chave = (votacao_id, escopo_atual())
+    nome = canal(*chave)
+    with _lock:
+        poller = _pollers.get(chave)
+        if poller:
+            poller["renderizar"] = renderizar
+            return nome, ao_vivo.assinar(nome, inicial=dict(poller["ultimo"]))
+        poller = {"token": token_atual(), "renderizar": renderizar, "ultimo": {}}
+        poller["thread"] = threading.Thread(target=_loop, args=(chave,), name=f"votacao-ao-vivo-{votacao_id}", daemon=True)
+        _pollers[chave] = poller
+        fila = ao_vivo.assinar(nome)
+        poller["thread"].start()
+    return nome, fila
@@ -1,4 +1,18 @@
+import threading
+import time
+from collections import OrderedDict
 from services.api_client import api
+from services.cache import por_request
+from services.fanout import em_paralelo
+
+# Cédulas já enviadas, pela chave de idempotência gerada no formulário de voto.
+# Reenvio da mesma cédula (duplo clique, F5 no POST) não duplica votos: espera o envio
+# em andamento ou só manda os votos que ainda não foram registrados.
+CEDULA_TTL = 600
+CEDULA_MAX = 2000
+
+_cedulas_lock = threading.Lock()
+_cedulas = OrderedDict()  # (votacao_id, votante_id, chave) -> {"registrados", "resultado", "evento", "expira_em"}
 
 def criar_votacao(rodada_id: int, abre_em: str, fecha_em: str, tipo: str):
     return api("POST", f"/api/peladas/rodadas/{rodada_id}/votacoes", json={
@@ -14,6 +28,7 @@ def listar_votacoes_rodada(rodada_id: int):
     except Exception:
         return None
 
+@por_request("obter_votacao")
 def obter_votacao(votacao_id: int):
     """Busca detalhes de uma votação (se a API implementar GET)"""
     try:
@@ -21,6 +36,7 @@ def obter_votacao(votacao_id: int):
     except Exception:
         return None
 
+@por_request("obter_resultado")
 def obter_resultado(votacao_id: int):
     """Busca o resultado/ranking de uma votação específica"""
     return api("GET", f"/api/peladas/votacoes/{votacao_id}/resultado")
@@ -40,3 +56,70 @@ def votar(votacao_id: int, jogador_votante_id: int, jogador_votado_id: int, pont
 def encerrar_votacao(votacao_id: int):
     """Encerra uma votação manualmente"""
     return api("POST", f"/api/peladas/votacoes/{votacao_id}/encerrar")
+
+def _votar_ou_erro(votacao_id: int, jogador_votante_id: int, jogador_votado_id: int, chave: str | None):
+    headers = {"Idempotency-Key": f"{chave}:{jogador_votado_id}"} if chave else None
+    try:
+        api("POST", f"/api/peladas/votacoes/{votacao_id}/votar", json={
+            "jogador_votante_id": jogador_votante_id,
+            "jogador_votado_id": jogador_votado_id,
+            "pontos": 1
+        }, headers=headers)
+        return None
+    except Exception as e:  # ApiError ou falha de rede: vira falha do voto, não da cédula inteira
+        return e
+
+def votar_cedula(votacao_id: int, jogador_votante_id: int, votados_ids: list, chave: str | None = None) -> dict:
+    """
+    Registra os votos de uma cédula (1 ponto por jogador) em paralelo.
+    Retorna {"ok": bool, "registrados": [ids], "falhas": {id: exceção}, "repetida": bool};
+    "ok" só é True se todos os votos da cédula estiverem registrados.
+    Com `chave`, reenvios da mesma cédula não repetem votos já aceitos.
+    """
+    votados_ids = list(dict.fromkeys(votados_ids))
+    id_cedula = (votacao_id, jogador_votante_id, chave) if chave else None
+    agora = time.monotonic()
+    with _cedulas_lock:
+        for k in [k for k, c in _cedulas.items() if c["expira_em"] < agora and not c["evento"]]:
+            del _cedulas[k]
+        cedula = _cedulas.get(id_cedula) if id_cedula else None
+        if cedula and cedula["evento"]:
+            evento = cedula["evento"]
+        else:
+            evento = None
+            if cedula is None:
+                cedula = {"registrados": set(), "resultado": None, "evento": None, "expira_em": 0}
+                if id_cedula:
+                    _cedulas[id_cedula] = cedula
+                    while len(_cedulas) > CEDULA_MAX:
+                        _cedulas.popitem(last=False)
+            cedula["evento"] = threading.Event()
+            pendentes = [j for j in votados_ids if j not in cedula["registrados"]]
+
+    if evento is not None:
+        # mesma cédula já sendo enviada por outro request: usa o resultado dele
+        evento.wait(timeout=30)
+        with _cedulas_lock:
+            return {**(cedula["resultado"] or {"ok": False, "registrados": [], "falhas": {}}), "repetida": True}
+
+    erros = {}
+    try:
+        erros = em_paralelo({
+            j: (lambda j=j: _votar_ou_erro(votacao_id, jogador_votante_id, j, chave))
+            for j in pendentes
+        })
+    finally:
+        with _cedulas_lock:
+            for j in pendentes:
+                if j in erros and erros[j] is None:
+                    cedula["registrados"].add(j)
+            falhas = {j: e for j, e in erros.items() if e is not None}
+            cedula["resultado"] = {
+                "ok": all(j in cedula["registrados"] for j in votados_ids),
+                "registrados": [j for j in votados_ids if j in cedula["registrados"]],
+                "falhas": falhas,
+            }
+            cedula["expira_em"] = time.monotonic() + CEDULA_TTL
+            cedula["evento"].set()
+            cedula["evento"] = None
+    return {**cedula["resultado"], "repetida": len(pendentes) < len(votados_ids)}
@@ -0,0 +1,60 @@
+import random
+import pytest
+from services import balanceamento as bal
+
+def _forca_aleatoria(n, seed=42):
+    rng = random.Random(seed)
+    return {j: bal.FORCA_BASE + rng.paretovariate(2.5) for j in range(n)}
+
+def test_jogadores_por_time_limita_vagas_e_sobra_fica_de_reserva():
+    forca = {j: float(j) for j in range(1, 11)}
+    r = bal.sortear(forca, 2, jogadores_por_time=3)
+    assert [len(t) for t in r["times"]] == [3, 3]
+    # os mais fracos ficam de fora
+    assert sorted(r["reservas"]) == [1, 2, 3, 4]
+    assert sorted(j for t in r["times"] for j in t) == list(range(5, 11))
+
+def test_divisao_desigual_sem_limite_distribui_todos():
+    forca = _forca_aleatoria(11)
+    r = bal.sortear(forca, 3)
+    assert sorted(len(t) for t in r["times"]) == [3, 4, 4]
+    assert r["reservas"] == []
+    assert sorted(j for t in r["times"] for j in t) == list(range(11))
+
+def test_menos_jogadores_que_times():
+    r = bal.sortear({1: 2.0, 2: 1.0}, 4)
+    assert len(r["times"]) == 4
+    assert sorted(len(t) for t in r["times"]) == [0, 0, 1, 1]
+    assert r["reservas"] == []
+
+def test_quantidade_de_times_invalida():
+    with pytest.raises(ValueError):
+        bal.sortear({1: 1.0}, 0)
+
+def test_busca_local_reduz_o_desvio_do_guloso():
+    forca = _forca_aleatoria(20)
+    times, _ = bal.guloso(forca, 4)
+    antes = bal.desvio(forca, times)
+    trocas = bal.busca_local(forca, times)
+    assert trocas > 0
+    assert bal.desvio(forca, times) < antes
+    # trocas mantêm o tamanho dos times
+    assert sorted(len(t) for t in times) == [5, 5, 5, 5]
+
+def test_busca_local_nunca_piora():
+    for seed in range(20):
+        forca = _forca_aleatoria(30, seed)
+        times, _ = bal.guloso(forca, 6)
+        antes = bal.desvio(forca, times)
+        bal.busca_local(forca, times)
+        assert bal.desvio(forca, times) <= antes + 1e-12
+
+def test_forcas_com_estatisticas_zeradas():
+    ids = [1, 2, 3]
+    numeros = {"gols": {1: 0, 2: 0, 3: 0}, "assistencias": {}, "votos": {}}
+    assert bal.forcas(ids, numeros) == {1: bal.FORCA_BASE, 2: bal.FORCA_BASE, 3: bal.FORCA_BASE}
+    assert bal.forcas(ids, {}) == {1: bal.FORCA_BASE, 2: bal.FORCA_BASE, 3: bal.FORCA_BASE}
+
+def test_forcas_normaliza_pelo_maior_do_grupo():
+    f = bal.forcas([1, 2], {"gols": {1: 4, 2: 2}}, pesos={"gols": 1.0})
+    assert f == {1: bal.FORCA_BASE + 1.0, 2: bal.FORCA_BASE + 0.5}
@@ -0,0 +1,141 @@
+import threading
+import pytest
+from flask import Flask
+from services import cache
+from services.api_client import ApiError, com_token, token_atual
+
+@pytest.fixture(autouse=True)
+def _cache_limpo():
+    cache.limpar()
+    yield
+    cache.limpar()
+
+def _leitura(tags=("item:{item_id}",)):
+    """Função de leitura cacheada que conta as chamadas reais e devolve o token usado"""
+    chamadas = []
+
+    @cache.cached("teste", ttl=60, tags=tags)
+    def obter(item_id):
+        chamadas.append(item_id)
+        return {"id": item_id, "token": token_atual()}
+
+    return obter, chamadas
+
+def test_escopos_de_tokens_diferentes_nao_se_misturam():
+    obter, chamadas = _leitura()
+    with com_token("token-a"):
+        assert obter(1)["token"] == "token-a"
+        assert obter(1)["token"] == "token-a"
+    with com_token("token-b"):
+        assert obter(1)["token"] == "token-b"
+    assert obter(1)["token"] is None  # anônimo
+    assert chamadas == [1, 1, 1]
+
+def test_valor_devolvido_e_copia():
+    obter, _ = _leitura()
+    obter(1)["id"] = 999
+    assert obter(1)["id"] == 1
+
+def test_invalidacao_por_tag_vale_para_todos_os_escopos():
+    obter, chamadas = _leitura()
+    for token in ("token-a", "token-b"):
+        with com_token(token):
+            obter(1)
+            obter(2)
+    cache.invalidar("item:1")
+    for token in ("token-a", "token-b"):
+        with com_token(token):
+            obter(1)
+            obter(2)
+    assert chamadas == [1, 2, 1, 2, 1, 1]
+
+def test_invalidacao_durante_leitura_em_andamento_nao_guarda_valor_velho():
+    lendo = threading.Event()
+    continuar = threading.Event()
+    versao = {"valor": "velho"}
+    chamadas = []
+
+    @cache.cached("corrida", ttl=60, tags=("item:{item_id}",))
+    def obter(item_id):
+        chamadas.append(item_id)
+        valor = versao["valor"]
+        lendo.set()
+        continuar.wait(5)
+        return valor
+
+    resultado = []
+    t = threading.Thread(target=lambda: resultado.append(obter(1)))
+    t.start()
+    lendo.wait(5)
+    # escrita concorrente: o valor lido antes dela não pode ficar no cache
+    versao["valor"] = "novo"
+    cache.invalidar("item:1")
+    continuar.set()
+    t.join()
+
+    assert resultado == ["velho"]
+    assert obter(1) == "novo"
+    assert len(chamadas) == 2
+
+def test_lru_remove_a_entrada_menos_usada(monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_MAX_ENTRIES", 2)
+    obter, chamadas = _leitura()
+    obter(1)
+    obter(2)
+    obter(1)  # 1 passa a ser a mais recente
+    obter(3)  # estoura o limite: sai a 2
+    evictions = cache.cache_stats()["evictions"]
+    obter(1)
+    obter(3)
+    obter(2)
+    assert chamadas == [1, 2, 3, 2]
+    assert evictions >= 1
+
+def test_excecao_nao_e_cacheada():
+    chamadas = []
+
+    @cache.cached("erro", ttl=60)
+    def obter(item_id):
+        chamadas.append(item_id)
+        raise ApiError(500, {"erro": "falhou"})
+
+    for _ in range(2):
+        with pytest.raises(ApiError):
+            obter(1)
+    assert chamadas == [1, 1]
+
+def test_invalida_roda_mesmo_com_erro_e_avisa_ouvintes(monkeypatch):
+    recebidas = []
+    monkeypatch.setattr(cache, "_ouvintes", [recebidas.append])
+    obter, chamadas = _leitura()
+    obter(7)
+
+    @cache.invalida("item:{item_id}", "outros")
+    def escrever(item_id):
+        raise ApiError(400, {"erro": "recusado"})
+
+    with pytest.raises(ApiError):
+        escrever(7)
+    obter(7)
+    assert chamadas == [7, 7]
+    assert recebidas == [{"item:7", "outros"}]
+
+def test_por_request_memoriza_so_dentro_do_request():
+    app = Flask(__name__)
+    chamadas = []
+
+    @cache.por_request("memo")
+    def obter(item_id):
+        chamadas.append(item_id)
+        return {"id": item_id}
+
+    with app.app_context():
+        obter(1)
+        obter(1)
+        assert cache.memo_request_stats() == {"memo": 1}
+        cache.invalidar("qualquer")  # escrita no meio do request descarta o memo
+        obter(1)
+    with app.app_context():
+        obter(1)
+    obter(1)  # fora de request: sempre chama
+    assert chamadas == [1, 1, 1, 1]
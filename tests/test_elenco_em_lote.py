@@ -0,0 +1,115 @@
+import threading
+import pytest
+from services import elenco_em_lote as lote
+from services import time_service as time_svc
+from services import time_jogadores_index as time_index
+from services.api_client import ApiError
+
+class BackendFalso:
+    """Elencos em memória com a regra da API: um jogador só pode estar em um time"""
+
+    def __init__(self, elencos: dict):
+        self.lock = threading.Lock()
+        self.elencos = {t: {j: dict(d) for j, d in e.items()} for t, e in elencos.items()}
+        self.chamadas = []
+        self.falhar = set()  # (op, time_id, jogador_id)
+
+    def _registrar(self, op, time_id, jogador_id):
+        self.chamadas.append((op, time_id, jogador_id))
+        if (op, time_id, jogador_id) in self.falhar:
+            raise ApiError(500, {"erro": f"falha em {op}"})
+
+    def obter_time(self, time_id):
+        with self.lock:
+            jogadores = [{"id": j, **d} for j, d in self.elencos[time_id].items()]
+        return {"time": {"id": time_id, "jogadores": jogadores}}
+
+    def remover_jogador(self, time_id, jogador_id):
+        with self.lock:
+            self._registrar("remover", time_id, jogador_id)
+            if jogador_id not in self.elencos[time_id]:
+                raise ApiError(404, {"erro": "jogador não está no time"})
+            del self.elencos[time_id][jogador_id]
+
+    def adicionar_jogador(self, time_id, jogador_id, capitao, posicao):
+        with self.lock:
+            self._registrar("adicionar", time_id, jogador_id)
+            if any(jogador_id in e for e in self.elencos.values()):
+                raise ApiError(400, {"erro": "jogador já está em um time"})
+            self.elencos[time_id][jogador_id] = {"capitao": capitao, "posicao": posicao}
+
+    def atualizar_jogador_time(self, time_id, jogador_id, posicao, capitao=None):
+        with self.lock:
+            self._registrar("atualizar", time_id, jogador_id)
+            self.elencos[time_id][jogador_id] = {"capitao": capitao, "posicao": posicao}
+
+@pytest.fixture
+def backend(monkeypatch):
+    def _criar(elencos):
+        b = BackendFalso(elencos)
+        for nome in ("obter_time", "remover_jogador", "adicionar_jogador", "atualizar_jogador_time"):
+            monkeypatch.setattr(time_svc, nome, getattr(b, nome))
+        monkeypatch.setattr(time_index, "atribuir", lambda t, j: None)
+        monkeypatch.setattr(time_index, "liberar", lambda t, j: None)
+        return b
+    return _criar
+
+def _membro(capitao=False, posicao=None):
+    return {"capitao": capitao, "posicao": posicao}
+
+def test_jogador_trocando_de_time_sai_antes_de_entrar(backend):
+    b = backend({1: {10: _membro(), 11: _membro()}, 2: {20: _membro()}})
+    r = lote.sincronizar({1: {10: {}}, 2: {20: {}, 11: {}}})
+    assert r["falhas"] == []
+    assert r["ops"] == {"remover": 1, "adicionar": 1, "atualizar": 0}
+    assert set(b.elencos[1]) == {10}
+    assert set(b.elencos[2]) == {20, 11}
+    assert b.chamadas.index(("remover", 1, 11)) < b.chamadas.index(("adicionar", 2, 11))
+    # times relidos depois das escritas
+    assert {j["id"] for j in r["times"][2]["jogadores"]} == {20, 11}
+
+def test_campos_omitidos_mantem_capitao_e_posicao(backend):
+    b = backend({1: {10: _membro(True, "Goleiro"), 11: _membro(False, "Zagueiro")}})
+    r = lote.sincronizar({1: {10: {}, 11: {}}})
+    assert r["ops"] == {"remover": 0, "adicionar": 0, "atualizar": 0}
+    assert b.chamadas == []
+
+    r = lote.sincronizar({1: {10: {"posicao": "Atacante"}, 11: {}}})
+    assert r["ops"]["atualizar"] == 1
+    assert b.elencos[1][10] == {"capitao": True, "posicao": "Atacante"}
+
+def test_jogador_novo_sem_campos_entra_sem_capitao_e_posicao(backend):
+    b = backend({1: {}})
+    lote.sincronizar({1: {10: {}}})
+    assert b.elencos[1][10] == {"capitao": False, "posicao": None}
+
+def test_demais_times_perdem_so_os_escalados(backend):
+    b = backend({
+        1: {},
+        2: {},
+        3: {10: _membro(), 30: _membro(True, "Goleiro")},  # fora da seleção
+        4: {40: _membro()},
+    })
+    r = lote.sincronizar({1: {10: {}}, 2: {20: {}}}, demais_times=[1, 2, 3, 4])
+    assert r["falhas"] == []
+    assert set(b.elencos[1]) == {10}
+    assert set(b.elencos[2]) == {20}
+    assert b.elencos[3] == {30: _membro(True, "Goleiro")}
+    assert b.elencos[4] == {40: _membro()}
+    assert not any(op[1] == 4 for op in b.chamadas)
+
+def test_lote_com_falha_parcial(backend):
+    b = backend({1: {10: _membro(), 11: _membro()}, 2: {}})
+    b.falhar = {("remover", 1, 10)}
+    r = lote.sincronizar({1: {}, 2: {10: {}, 11: {}, 12: {}}})
+
+    falhas = {(op, t, j) for op, t, j, _e in r["falhas"]}
+    # 10 não saiu do time 1, então nem tenta entrar no 2
+    assert falhas == {("remover", 1, 10), ("adicionar", 2, 10)}
+    assert ("adicionar", 2, 10) not in b.chamadas
+    erros = {(op, t, j): e for op, t, j, e in r["falhas"]}
+    assert isinstance(erros[("remover", 1, 10)], ApiError)
+    assert erros[("adicionar", 2, 10)] is None
+    # o resto do lote foi aplicado
+    assert set(b.elencos[1]) == {10}
+    assert set(b.elencos[2]) == {11, 12}
@@ -0,0 +1,105 @@
+import random
+from services import estatisticas
+
+# Loops anteriores (routes/rankings.scout e scout_service antes de services/estatisticas.py),
+# mantidos aqui como referência para os totais.
+
+def _total_anterior(data, campo):
+    if isinstance(data, list):
+        ranking = data
+    elif isinstance(data, dict):
+        ranking = data.get("ranking", [])
+    else:
+        ranking = []
+    total = 0
+    for item in ranking:
+        if isinstance(item, dict):
+            jogador = item.get("jogador", {})
+            qtd = (jogador.get(f"total_{campo}") if isinstance(jogador, dict) else None) or item.get(campo) or item.get(f"total_{campo}") or 0
+            total += int(qtd) if qtd else 0
+        elif isinstance(item, (int, float)):
+            total += int(item)
+    return total
+
+def _consolidado_anterior(temporadas, campo):
+    consolidado = {}
+    for data in temporadas:
+        ranking = data.get("ranking", []) if isinstance(data, dict) else data
+        for item in ranking:
+            jogador = item.get("jogador", {}) if isinstance(item, dict) else {}
+            jogador_id = jogador.get("id") if isinstance(jogador, dict) else None
+            if not jogador_id:
+                continue
+            qtd = (jogador.get(f"total_{campo}") if isinstance(jogador, dict) else None) or item.get(campo) or item.get(f"total_{campo}") or 0
+            qtd = int(qtd) if qtd else 0
+            atual = consolidado.setdefault(jogador_id, {"jogador": jogador, "total": 0})
+            atual["total"] += qtd
+    return {j: c["total"] for j, c in consolidado.items()}
+
+TEMPORADA = {
+    "ranking": [
+        {"jogador": {"id": 1, "apelido": "A", "total_gols": 5}},
+        {"jogador": {"id": 2, "apelido": "B"}, "gols": 3},
+        {"jogador": {"id": 3, "apelido": "C"}, "total_gols": 2},
+        {"jogador": {"id": 4, "apelido": "D", "total_gols": 0}, "gols": 4},  # 0 cai no fallback
+        {"jogador": {"id": 1, "apelido": "A"}, "gols": 1},                  # jogador repetido
+        {"jogador": {"id": 5, "apelido": "E"}, "gols": "2"},                # número em texto
+        {"jogador": {"id": "6", "apelido": "F"}, "gols": 1},                # id em texto
+        {"jogador": {"id": 7}, "gols": None},
+        {"jogador": None, "gols": 2},                                       # sem jogador: só no total
+        {"gols": 1},
+        {"jogador": {"apelido": "sem id"}, "total_gols": 3},
+        4,                                                                  # item numérico
+        "lixo",
+    ]
+}
+
+def test_total_da_temporada_igual_ao_loop_anterior():
+    for campo, data in (("gols", TEMPORADA), ("gols", TEMPORADA["ranking"]), ("gols", None), ("gols", {})):
+        assert estatisticas.total(estatisticas.coluna(data, campo)) == _total_anterior(data, campo)
+
+def test_total_de_assistencias_igual_ao_loop_anterior():
+    data = [
+        {"jogador": {"id": 1, "total_assistencias": 2}},
+        {"jogador": {"id": 2}, "assistencias": 1},
+        {"jogador": {"id": 3}, "total_assistencias": 4},
+        {"assistencias": 2},
+        3,
+    ]
+    col = estatisticas.coluna(data, "assistencias")
+    assert estatisticas.total(col) == _total_anterior(data, "assistencias") == 12
+    assert estatisticas.por_jogador(col) == {1: 2, 2: 1, 3: 4}
+
+def test_por_jogador_soma_repetidos_e_ignora_itens_sem_jogador():
+    col = estatisticas.coluna(TEMPORADA, "gols")
+    assert estatisticas.por_jogador(col) == {1: 6, 2: 3, 3: 2, 4: 4, 5: 2, 6: 1, 7: 0}
+    assert col["sem_jogador"] == 2 + 1 + 3 + 4
+    assert col["jogadores"][1]["apelido"] == "A"
+
+def test_id_invalido_nao_quebra_e_conta_no_total():
+    data = [{"jogador": {"id": "abc"}, "gols": 2}, {"jogador": {"id": 1.0}, "gols": 1}, {"jogador": {"id": [1]}, "gols": 1}]
+    col = estatisticas.coluna(data, "gols")
+    assert estatisticas.por_jogador(col) == {1: 1}
+    assert estatisticas.total(col) == _total_anterior(data, "gols") == 4
+
+def test_soma_entre_temporadas_igual_ao_consolidado_anterior():
+    rng = random.Random(3)
+    temporadas = [
+        {"ranking": [{"jogador": {"id": j, "apelido": f"J{j}"}, "gols": rng.randint(0, 9)} for j in rng.sample(range(1, 60), 40)]}
+        for _ in range(8)
+    ]
+    soma = estatisticas.somar([estatisticas.coluna(t, "gols") for t in temporadas])
+    anterior = _consolidado_anterior(temporadas, "gols")
+    assert soma["totais"] == anterior
+    assert estatisticas.total(soma) == sum(_total_anterior(t, "gols") for t in temporadas)
+    # top N: mesmos valores da ordenação completa anterior
+    top = estatisticas.top(soma, 10)
+    assert [v for _j, v in top] == sorted(anterior.values(), reverse=True)[:10]
+    assert all(anterior[j] == v for j, v in top)
+
+def test_somar_sem_temporadas():
+    assert estatisticas.somar([]) == estatisticas.vazia()
+
+def test_titulos_contam_campeoes_por_temporada():
+    titulos = estatisticas.titulos([[1, 2, "3"], [2, None, "x"], [2, 3]])
+    assert estatisticas.top(titulos) == [(2, 3), (3, 2), (1, 1)]
@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from services import votacao_service as svc
+from services.api_client import ApiError
+
+@pytest.fixture(autouse=True)
+def _limpar_cedulas():
+    svc._cedulas.clear()
+    yield
+    svc._cedulas.clear()
+
+class ApiFalsa:
+    """Registra os POSTs de voto; `falhar` são ids votados que respondem erro"""
+
+    def __init__(self, falhar=(), atraso=0.0):
+        self.lock = threading.Lock()
+        self.votos = []
+        self.falhar = set(falhar)
+        self.atraso = atraso
+
+    def __call__(self, method, path, json=None, params=None, headers=None):
+        time.sleep(self.atraso)
+        with self.lock:
+            self.votos.append(json["jogador_votado_id"])
+        if json["jogador_votado_id"] in self.falhar:
+            raise ApiError(400, {"erro": "voto recusado"})
+        return {"ok": True}
+
+def test_cedula_repetida_em_paralelo_vota_uma_vez(monkeypatch):
+    api = ApiFalsa(atraso=0.05)
+    monkeypatch.setattr(svc, "api", api)
+    resultados = []
+    barreira = threading.Barrier(5)
+
+    def enviar():
+        barreira.wait()
+        resultados.append(svc.votar_cedula(9, 1, [2, 3, 4], chave="abc"))
+
+    threads = [threading.Thread(target=enviar) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(api.votos) == [2, 3, 4]
+    assert all(r["ok"] and r["registrados"] == [2, 3, 4] for r in resultados)
+    assert sum(1 for r in resultados if not r["repetida"]) == 1
+
+def test_chaves_diferentes_nao_se_misturam(monkeypatch):
+    api = ApiFalsa()
+    monkeypatch.setattr(svc, "api", api)
+    svc.votar_cedula(9, 1, [2], chave="a")
+    svc.votar_cedula(9, 1, [2], chave="b")
+    assert api.votos == [2, 2]
+
+def test_falha_parcial_e_reenvio_so_do_que_falhou(monkeypatch):
+    api = ApiFalsa(falhar={3})
+    monkeypatch.setattr(svc, "api", api)
+    r = svc.votar_cedula(9, 1, [2, 3, 4], chave="abc")
+    assert r["ok"] is False
+    assert r["registrados"] == [2, 4]
+    assert list(r["falhas"]) == [3]
+    assert isinstance(r["falhas"][3], ApiError)
+
+    api.falhar.clear()
+    api.votos.clear()
+    r = svc.votar_cedula(9, 1, [2, 3, 4], chave="abc")
+    assert api.votos == [3]
+    assert r["ok"] is True
+    assert r["registrados"] == [2, 3, 4]
+    assert r["falhas"] == {}
+    assert r["repetida"] is True
+
+def test_sem_chave_nao_deduplica(monkeypatch):
+    api = ApiFalsa()
+    monkeypatch.setattr(svc, "api", api)
+    svc.votar_cedula(9, 1, [2, 2, 3])
+    svc.votar_cedula(9, 1, [2, 3])
+    # ids repetidos na mesma cédula contam uma vez; sem chave cada envio é novo
+    assert api.votos.count(2) == 2 and api.votos.count(3) == 2
+    assert not svc._cedulas
+
+def test_cedula_expirada_e_esquecida(monkeypatch):
+    api = ApiFalsa()
+    monkeypatch.setattr(svc, "api", api)
+    monkeypatch.setattr(svc, "CEDULA_TTL", 60)
+    svc.votar_cedula(9, 1, [2], chave="abc")
+    svc.votar_cedula(9, 1, [2], chave="abc")
+    assert api.votos == [2]
+
+    # passa do TTL: a próxima cédula (qualquer uma) varre a expirada
+    agora = time.monotonic()
+    monkeypatch.setattr(svc.time, "monotonic", lambda: agora + 61)
+    svc.votar_cedula(9, 5, [6], chave="outra")
+    assert (9, 1, "abc") not in svc._cedulas
+    svc.votar_cedula(9, 1, [2], chave="abc")
+    assert api.votos == [2, 6, 2]
+
+def test_limite_de_cedulas_descarta_as_mais_antigas(monkeypatch):
+    monkeypatch.setattr(svc, "api", ApiFalsa())
+    monkeypatch.setattr(svc, "CEDULA_MAX", 3)
+    for votante in range(5):
+        svc.votar_cedula(9, votante, [99], chave="k")
+    assert list(svc._cedulas) == [(9, 2, "k"), (9, 3, "k"), (9, 4, "k")]